@@ -1,12 +1,18 @@
+import logging
+import time
+
 from flask import Flask
 from flask_wtf import CSRFProtect
 
 from config import Config
 
-from .db.connection import db_session
+from . import assets, fragments, profiling, templating, throttle
+from .db.connection import all_engines, db_session, describe_engine, init_engine
+from .products import typeahead
 
 
 def create_app():
+    start = time.perf_counter()
     app = Flask(__name__)
     app.config.from_object(Config)
 
@@ -17,10 +23,25 @@ def create_app():
     if app.config.get("SECRET_KEY") is None:
         raise RuntimeError("SECRET_KEY is not configured.")
 
+    if app.logger.level == logging.NOTSET:
+        # Outside debug mode Flask inherits WARNING from the root logger, which
+        # would hide the startup summaries below unless logging is configured.
+        app.logger.setLevel(logging.INFO)
+
+    init_engine()
+    app.logger.info("Database engine settings: %s", describe_engine())
+    profiling.init_app(app, *all_engines())
+    fragments.init_app(app)
+    throttle.init_app(app)
+    templating.init_app(app)
+    assets.init_app(app)
+    typeahead.init_app(app)
+
     @app.teardown_appcontext
     def shutdown_session(exception=None):  # noqa: ARG001
         db_session.remove()
 
+    from .api.routes import api_bp
     from .categories.routes import categories_bp
     from .errors.handlers import errors
     from .main.routes import main_bp
@@ -29,6 +50,9 @@ def create_app():
     app.register_blueprint(main_bp)
     app.register_blueprint(categories_bp)
     app.register_blueprint(products_bp)
+    app.register_blueprint(api_bp)
     app.register_blueprint(errors)
 
+    app.extensions["startup_ms"] = (time.perf_counter() - start) * 1000
+    app.logger.info("Application created in %.1f ms", app.extensions["startup_ms"])
     return app
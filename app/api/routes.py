@@ -0,0 +1,165 @@
+from datetime import datetime
+from typing import Sequence
+
+from flask import Blueprint, abort, current_app, jsonify, request
+from sqlalchemy import Row
+
+from ..db import changes, queries
+from ..db.models import MAX_INT
+from ..db.pagination import decode_cursor, encode_cursor
+from ..main.utils import conditional_response, get_page_args
+from ..products.utils import get_listing_args
+
+api_bp = Blueprint("api", __name__, url_prefix="/api")
+
+DEFAULT_PRODUCT_FIELDS = ("id", "name", "price", "stock", "category_id")
+DEFAULT_CATEGORY_FIELDS = ("id", "name", "description")
+CHANGE_GROUPS = {changes.PRODUCT: "products", changes.CATEGORY: "categories"}
+
+
+def error(message: str, status: int):
+    response = jsonify(error=message)
+    response.status_code = status
+    abort(response)
+
+
+def get_fields(available: dict, default: Sequence[str]) -> list[str]:
+    raw = request.args.get("fields")
+    if not raw:
+        return list(default)
+    fields = [field.strip() for field in raw.split(",")]
+    fields = list(dict.fromkeys(field for field in fields if field))
+    unknown = [field for field in fields if field not in available]
+    if unknown:
+        error(f"Unknown fields: {', '.join(unknown)}.", 400)
+    return fields or list(default)
+
+
+def get_ids() -> list[int] | None:
+    raw = request.args.get("ids")
+    if raw is None:
+        return None
+    try:
+        ids = list(dict.fromkeys(int(value) for value in raw.split(",") if value))
+    except ValueError:
+        error("ids must be a comma-separated list of integers.", 400)
+    if any(not 0 < id_ <= MAX_INT for id_ in ids):
+        error(f"ids must be between 1 and {MAX_INT}.", 400)
+    if len(ids) > current_app.config["API_MAX_IDS"]:
+        error(f"At most {current_app.config['API_MAX_IDS']} ids per request.", 400)
+    return ids
+
+
+def serialize(row: Row, fields: Sequence[str]) -> dict:
+    item = {}
+    for field in fields:
+        value = row._mapping[field]
+        item[field] = value.isoformat() if isinstance(value, datetime) else value
+    return item
+
+
+def listing(rows_by_ids, rows_page, fields: Sequence[str], **page_args):
+    ids = get_ids()
+    if ids is not None:
+        rows = rows_by_ids(ids, fields) if ids else []
+        return jsonify(items=[serialize(row, fields) for row in rows])
+
+    page = rows_page(fields, **page_args)
+    return jsonify(
+        items=[serialize(row, fields) for row in page.items],
+        next_cursor=page.next_cursor,
+        prev_cursor=page.prev_cursor,
+    )
+
+
+@api_bp.route("/products")
+def list_products():
+    fields = get_fields(queries.PRODUCT_API_FIELDS, DEFAULT_PRODUCT_FIELDS)
+
+    def render():
+        return listing(
+            queries.get_products_by_ids,
+            queries.get_products_api_page,
+            fields,
+            **get_listing_args(),
+        )
+
+    return conditional_response(render, queries.get_catalog_version())
+
+
+@api_bp.route("/products/<int:product_id>")
+def get_product(product_id):
+    fields = get_fields(queries.PRODUCT_API_FIELDS, DEFAULT_PRODUCT_FIELDS)
+    rows = []
+    if product_id <= MAX_INT:
+        rows = queries.get_products_by_ids([product_id], fields)
+    if not rows:
+        error("Product not found.", 404)
+    return jsonify(serialize(rows[0], fields))
+
+
+@api_bp.route("/categories")
+def list_categories():
+    fields = get_fields(queries.CATEGORY_API_FIELDS, DEFAULT_CATEGORY_FIELDS)
+
+    def render():
+        return listing(
+            queries.get_categories_by_ids,
+            queries.get_categories_api_page,
+            fields,
+            **get_page_args(),
+        )
+
+    return conditional_response(render, queries.get_catalog_version())
+
+
+@api_bp.route("/categories/<int:category_id>")
+def get_category(category_id):
+    fields = get_fields(queries.CATEGORY_API_FIELDS, DEFAULT_CATEGORY_FIELDS)
+    rows = []
+    if category_id <= MAX_INT:
+        rows = queries.get_categories_by_ids([category_id], fields)
+    if not rows:
+        error("Category not found.", 404)
+    return jsonify(serialize(rows[0], fields))
+
+
+@api_bp.route("/changes")
+def list_changes():
+    """Changes after ``after``, collapsed to the latest operation per row.
+
+    Clients fetch the upserted ids through the ids= listings and drop the
+    deleted ones. An empty batch echoes the cursor back unchanged.
+    """
+    cursor = request.args.get("after")
+    after = decode_cursor(cursor, (changes.txid, int))
+    if after is None and (legacy := decode_cursor(cursor, (int,))):
+        # Cursors issued before txids were logged; those rows all have txid 0.
+        after = (0, *legacy)
+    if cursor and after is None:
+        error("Invalid cursor.", 400)
+    max_batch = current_app.config["API_MAX_IDS"]
+    limit = max(1, min(request.args.get("limit", max_batch, type=int), max_batch))
+
+    rows = changes.get_changes(after or (0, 0), limit)
+    latest = {}
+    for row in rows:
+        latest.pop((row.entity, row.entity_id), None)
+        latest[(row.entity, row.entity_id)] = row.operation
+
+    batch = {name: {"upserted": [], "deleted": []} for name in CHANGE_GROUPS.values()}
+    for (entity, entity_id), operation in latest.items():
+        key = "upserted" if operation == changes.UPSERT else "deleted"
+        batch[CHANGE_GROUPS[entity]][key].append(entity_id)
+
+    return jsonify(
+        **batch,
+        next_cursor=encode_cursor([rows[-1].txid, rows[-1].id]) if rows else cursor,
+        has_more=len(rows) == limit,
+    )
+
+
+@api_bp.route("/changes/head")
+def changes_head():
+    """Cursor to start following changes from, taken before a full sync."""
+    return jsonify(cursor=encode_cursor(changes.get_head()))
@@ -0,0 +1,153 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+from pathlib import Path
+
+import click
+from flask import Flask, Response, request, send_from_directory
+from werkzeug.security import safe_join
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+# Preferred first when the client weighs encodings equally.
+SUFFIXES = {"br": ".br", "gzip": ".gz"}
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data)
+    return gzip.compress(data, compresslevel=6, mtime=0)
+
+
+def available_encodings() -> list[str]:
+    return [encoding for encoding in SUFFIXES if encoding != "br" or brotli]
+
+
+def negotiate(encodings: list[str]) -> str | None:
+    best, best_quality = None, 0
+    for encoding in encodings:
+        quality = request.accept_encodings.quality(encoding)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+class Fingerprints:
+    """Content hashes of static files, refreshed when a file changes."""
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        self._hashes: dict[str, tuple[int, str]] = {}
+
+    def get(self, filename: str) -> str | None:
+        path = safe_join(self.directory, filename)
+        if path is None:
+            return None
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+        cached = self._hashes.get(filename)
+        if cached is None or cached[0] != mtime:
+            digest = hashlib.sha256(Path(path).read_bytes()).hexdigest()[:12]
+            cached = self._hashes[filename] = (mtime, digest)
+        return cached[1]
+
+
+def build_precompressed(directory: str) -> list[str]:
+    """Write .br/.gz siblings for every static file they make smaller."""
+    written = []
+    for path in sorted(Path(directory).rglob("*")):
+        if not path.is_file() or path.suffix in SUFFIXES.values():
+            continue
+        data = path.read_bytes()
+        for encoding in available_encodings():
+            target = path.with_name(path.name + SUFFIXES[encoding])
+            compressed = compress(data, encoding)
+            if len(compressed) < len(data):
+                target.write_bytes(compressed)
+                written.append(str(target.relative_to(directory)))
+            else:
+                target.unlink(missing_ok=True)
+    return written
+
+
+def init_app(app: Flask) -> None:
+    fingerprints = Fingerprints(app.static_folder)
+    min_size = app.config["COMPRESS_MIN_SIZE"]
+
+    @app.url_defaults
+    def fingerprint_static_urls(endpoint, values):
+        if endpoint == "static" and "filename" in values and "v" not in values:
+            digest = fingerprints.get(values["filename"])
+            if digest:
+                values["v"] = digest
+
+    def serve_static(filename):
+        path = safe_join(app.static_folder, filename)
+        encodings = []
+        if path and os.path.isfile(path):
+            source_mtime = os.stat(path).st_mtime
+            for encoding in available_encodings():
+                variant = path + SUFFIXES[encoding]
+                if (
+                    os.path.isfile(variant)
+                    and os.stat(variant).st_mtime >= source_mtime
+                ):
+                    encodings.append(encoding)
+
+        encoding = negotiate(encodings)
+        if encoding:
+            mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+            response = send_from_directory(
+                app.static_folder, filename + SUFFIXES[encoding], mimetype=mimetype
+            )
+            response.content_encoding = encoding
+        else:
+            response = app.send_static_file(filename)
+        response.vary.add("Accept-Encoding")
+
+        version = request.args.get("v")
+        if version and version == fingerprints.get(filename):
+            response.cache_control.no_cache = None
+            response.cache_control.public = True
+            response.cache_control.max_age = IMMUTABLE_MAX_AGE
+            response.cache_control.immutable = True
+        return response
+
+    app.view_functions["static"] = serve_static
+
+    @app.after_request
+    def compress_html(response: Response) -> Response:
+        if (
+            response.mimetype != "text/html"
+            or response.status_code != 200
+            or response.direct_passthrough
+            or response.is_streamed
+            or "Content-Encoding" in response.headers
+        ):
+            return response
+        response.vary.add("Accept-Encoding")
+        data = response.get_data()
+        encoding = negotiate(available_encodings())
+        if len(data) < min_size or encoding is None:
+            return response
+
+        response.set_data(compress(data, encoding))
+        response.content_encoding = encoding
+        return response
+
+    @app.cli.command("build-assets")
+    def build_assets_command():
+        """Precompress static files next to the originals."""
+        written = build_precompressed(app.static_folder)
+        for name in written:
+            click.echo(name)
+        if brotli is None:
+            click.echo("brotli is not installed, only gzip variants were built.")
+        click.echo(f"Wrote {len(written)} precompressed files.")
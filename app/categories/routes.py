@@ -1,9 +1,19 @@
-from flask import Blueprint, current_app, flash, redirect, render_template, url_for
+from flask import (
+    Blueprint,
+    current_app,
+    flash,
+    redirect,
+    render_template,
+    request,
+    url_for,
+)
 from sqlalchemy.exc import IntegrityError
 
 from ..db import queries
+from ..fragments import cached_fragment
 from ..main.forms import DeleteForm
-from ..main.utils import admin_required
+from ..main.utils import admin_required, conditional_response
+from ..products.utils import get_listing_args
 from .forms import CategoryForm
 
 categories_bp = Blueprint("categories", __name__, url_prefix="/categories")
@@ -11,8 +21,17 @@ categories_bp = Blueprint("categories", __name__, url_prefix="/categories")
 
 @categories_bp.route("/")
 def list_categories():
-    categories = queries.get_all_categories()
-    return render_template("categories.html", categories=categories)
+    version = queries.get_catalog_version()
+
+    def render_grid():
+        categories = queries.get_category_summaries()
+        return render_template("_category_grid.html", categories=categories)
+
+    def render():
+        category_grid = cached_fragment(version, render_grid)
+        return render_template("categories.html", category_grid=category_grid)
+
+    return conditional_response(render, version)
 
 
 @categories_bp.route("/<int:category_id>")
@@ -22,13 +41,23 @@ def view_category(category_id):
         flash("Category not found.", "error")
         return redirect(url_for("categories.list_categories"))
 
-    delete_form = DeleteForm()
-    return render_template(
-        "products.html",
-        category=category,
-        products=category.products,
-        delete_form=delete_form,
-    )
+    version = queries.get_catalog_version()
+
+    def render_grid():
+        page = queries.get_products_page(
+            category_id=category_id, **get_listing_args(with_category=False)
+        )
+        return render_template("_product_grid.html", products=page.items, page=page)
+
+    def render():
+        return render_template(
+            "products.html",
+            category=category,
+            product_grid=cached_fragment(version, render_grid),
+            delete_form=DeleteForm(),
+        )
+
+    return conditional_response(render, category, version)
 
 
 @categories_bp.route("/add", methods=["GET", "POST"])
@@ -61,16 +90,20 @@ def edit_category(category_id):
         flash("The default category cannot be edited.", "error")
         return redirect(url_for("categories.list_categories"))
 
-    category = queries.get_category_by_id(category_id)
-    if category is None:
-        flash("Category not found.", "error")
-        return redirect(url_for("categories.list_categories"))
+    category = None
+    if request.method == "GET":
+        category = queries.get_category_by_id(category_id)
+        if category is None:
+            flash("Category not found.", "error")
+            return redirect(url_for("categories.list_categories"))
 
     form = CategoryForm(obj=category)
     if form.validate_on_submit():
         try:
             name, description = form.name.data, form.description.data
-            queries.update_category(category_id, name, description)
+            if not queries.update_category(category_id, name, description):
+                flash("Category not found.", "error")
+                return redirect(url_for("categories.list_categories"))
             flash("Category updated successfully.", "success")
             return redirect(
                 url_for("categories.view_category", category_id=category_id)
@@ -81,11 +114,11 @@ def edit_category(category_id):
     return render_template(
         "form.html",
         form=form,
-        title=f"{category.name} – Edit Category",
+        title=f"{category.name} – Edit Category" if category else "Edit Category",
         button_text="Edit Category",
         button_class="btn-warning",
-        cancel_url=url_for("categories.view_category", category_id=category.id),
-        action_url=url_for("categories.edit_category", category_id=category.id),
+        cancel_url=url_for("categories.view_category", category_id=category_id),
+        action_url=url_for("categories.edit_category", category_id=category_id),
     )
 
 
@@ -96,13 +129,11 @@ def delete_category(category_id):
         flash("The default category cannot be deleted.", "error")
         return redirect(url_for("categories.list_categories"))
 
-    category = queries.get_category_by_id(category_id)
-    if category is None:
+    count = queries.delete_category(category_id)
+    if count is None:
         flash("Category not found.", "error")
         return redirect(url_for("categories.list_categories"))
 
-    count = queries.get_product_count_by_category(category_id)
-    queries.delete_category(category_id)
     flash("Category deleted successfully.", "success")
     if count > 0:
         default_name = current_app.config["DEFAULT_CATEGORY_NAME"]
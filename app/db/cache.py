@@ -0,0 +1,64 @@
+import threading
+from typing import Any, Callable, Hashable
+
+from sqlalchemy import Connection, insert, select, update
+
+from .connection import db_session
+from .models import CacheVersion
+
+CATEGORIES = "categories"
+PRODUCTS = "products"
+VERSION_NAMES = (CATEGORIES, PRODUCTS)
+
+
+def seed_versions(conn: Connection) -> None:
+    """Create the counter rows up front so concurrent writers only UPDATE them.
+
+    Two first writers that both found no row would otherwise both INSERT.
+    """
+    existing = set(conn.scalars(select(CacheVersion.name)))
+    missing = [name for name in VERSION_NAMES if name not in existing]
+    if missing:
+        conn.execute(insert(CacheVersion), [{"name": name} for name in missing])
+
+
+def get_versions(*names: str) -> tuple[int, ...]:
+    stmt = select(CacheVersion.name, CacheVersion.version).where(
+        CacheVersion.name.in_(names)
+    )
+    versions = dict(db_session.execute(stmt).tuples().all())
+    return tuple(versions.get(name, 0) for name in names)
+
+
+def bump_version(*names: str) -> None:
+    """Increment counters whose rows seed_versions created with the schema."""
+    for name in names:
+        db_session.execute(
+            update(CacheVersion)
+            .where(CacheVersion.name == name)
+            .values(version=CacheVersion.version + 1)
+        )
+
+
+class VersionedCache:
+    def __init__(self, *names: str) -> None:
+        self.names = names
+        self._lock = threading.Lock()
+        self._version: tuple[int, ...] | None = None
+        self._values: dict[Hashable, Any] = {}
+
+    def get(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        version = get_versions(*self.names)
+        with self._lock:
+            if version != self._version:
+                self._version = version
+                self._values = {}
+            elif key in self._values:
+                return self._values[key]
+
+        value = loader()
+        if value is not None:
+            with self._lock:
+                if version == self._version:
+                    self._values[key] = value
+        return value
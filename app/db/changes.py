@@ -0,0 +1,85 @@
+from collections.abc import Iterable
+
+from sqlalchemy import Row, Select, func, insert, literal, select, tuple_
+from sqlalchemy.orm import InstrumentedAttribute
+
+from .connection import db_session
+from .models import Change
+
+PRODUCT = "product"
+CATEGORY = "category"
+UPSERT = "upsert"
+DELETE = "delete"
+
+# Transaction ids are 64-bit, unlike the Integer columns cursors usually hold.
+MAX_TXID = 2**63 - 1
+
+# Feed positions are (txid, id) pairs. Postgres writers commit in any order,
+# so a change id can become visible after a higher one. Each row records its
+# transaction instead, and readers stop short of the oldest transaction still
+# in flight: everything before that is final. SQLite runs one writer at a
+# time, so txid stays 0 there and ids alone give the commit order.
+
+
+def _is_postgres() -> bool:
+    return db_session.get_bind().dialect.name == "postgresql"
+
+
+def _txid():
+    return func.txid_current() if _is_postgres() else literal(0)
+
+
+def _settled(stmt: Select) -> Select:
+    if _is_postgres():
+        horizon = func.txid_snapshot_xmin(func.txid_current_snapshot())
+        stmt = stmt.where(Change.txid < horizon)
+    return stmt
+
+
+def txid(value) -> int:
+    """Cursor cast for the txid half of a feed position."""
+    value = int(value)
+    if not 0 <= value <= MAX_TXID:
+        raise ValueError(value)
+    return value
+
+
+def record_changes(entity: str, operation: str, ids: Iterable[int]) -> None:
+    rows = [
+        {"entity": entity, "entity_id": entity_id, "operation": operation}
+        for entity_id in ids
+    ]
+    if rows:
+        db_session.execute(insert(Change).values(txid=_txid()), rows)
+
+
+def record_changes_where(
+    entity: str, operation: str, id_column: InstrumentedAttribute, *criteria
+) -> None:
+    """Log a change for every row matching ``criteria`` in one INSERT ... SELECT."""
+    columns = (_txid(), literal(entity), id_column, literal(operation))
+    rows = select(*columns).where(*criteria)
+    db_session.execute(
+        insert(Change).from_select(["txid", "entity", "entity_id", "operation"], rows)
+    )
+
+
+def get_changes(after: tuple[int, int] = (0, 0), limit: int = 500) -> list[Row]:
+    stmt = (
+        select(
+            Change.txid, Change.id, Change.entity, Change.entity_id, Change.operation
+        )
+        .where(tuple_(Change.txid, Change.id) > tuple(after))
+        .order_by(Change.txid, Change.id)
+        .limit(limit)
+    )
+    return db_session.execute(_settled(stmt)).all()
+
+
+def get_head() -> tuple[int, int]:
+    stmt = (
+        select(Change.txid, Change.id)
+        .order_by(Change.txid.desc(), Change.id.desc())
+        .limit(1)
+    )
+    return tuple(db_session.execute(_settled(stmt)).first() or (0, 0))
@@ -1,24 +1,134 @@
 import os
+import random
 import sqlite3
 
 from dotenv import load_dotenv
-from sqlalchemy import create_engine, event
-from sqlalchemy.orm import scoped_session, sessionmaker
+from sqlalchemy import URL, Engine, Select, create_engine, event, make_url
+from sqlalchemy.orm import Session, scoped_session, sessionmaker
 
-load_dotenv()
-db_url = os.getenv("DB_URL")
-if db_url is None:
-    raise ValueError("DB_URL environment variable not set")
+engine: Engine | None = None
+replica_engines: list[Engine] = []
+pragmas: dict[str, str | int] = {}
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return default if value in (None, "") else int(value)
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value in (None, ""):
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def sqlite_pragmas() -> dict[str, str | int]:
+    return {
+        "foreign_keys": "ON",
+        "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+        "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+        "busy_timeout": _env_int("SQLITE_BUSY_TIMEOUT_MS", 5000),
+        "mmap_size": _env_int("SQLITE_MMAP_SIZE", 256 * 2**20),
+        "cache_size": _env_int("SQLITE_CACHE_SIZE", -64 * 2**10),
+    }
 
-engine = create_engine(db_url)
-db_session = scoped_session(
-    sessionmaker(autocommit=False, autoflush=False, bind=engine)
-)
 
+def engine_options(url: str | URL) -> dict:
+    if make_url(url).get_backend_name() == "sqlite":
+        return {}
 
-@event.listens_for(engine, "connect")
-def enable_foreign_keys(dbapi_connection, connection_record):  # noqa: ARG001
+    options = {
+        "pool_size": _env_int("DB_POOL_SIZE", 10),
+        "max_overflow": _env_int("DB_MAX_OVERFLOW", 10),
+        "pool_timeout": _env_int("DB_POOL_TIMEOUT", 10),
+        "pool_recycle": _env_int("DB_POOL_RECYCLE", 1800),
+        "pool_pre_ping": _env_bool("DB_POOL_PRE_PING", True),
+    }
+    statement_timeout = _env_int("DB_STATEMENT_TIMEOUT_MS", 30000)
+    if statement_timeout:
+        options["connect_args"] = {
+            "options": f"-c statement_timeout={statement_timeout}"
+        }
+    return options
+
+
+def describe_engine() -> dict:
+    engine = get_engine()
+    settings = {"dialect": engine.dialect.name, "replicas": len(replica_engines)}
+    if engine.dialect.name == "sqlite":
+        return {**settings, **pragmas}
+    return {**settings, **engine_options(engine.url)}
+
+
+def configure_sqlite(dbapi_connection, connection_record):  # noqa: ARG001
     if isinstance(dbapi_connection, sqlite3.Connection):
         cursor = dbapi_connection.cursor()
-        cursor.execute("PRAGMA foreign_keys=ON")
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
         cursor.close()
+
+
+def init_engine() -> Engine:
+    """Create the primary and replica engines from the environment, once."""
+    global engine, replica_engines, pragmas
+    if engine is not None:
+        return engine
+
+    load_dotenv()
+    db_url = os.getenv("DB_URL")
+    if db_url is None:
+        raise ValueError("DB_URL environment variable not set")
+    replica_urls = [url.strip() for url in os.getenv("DB_REPLICA_URLS", "").split(",")]
+
+    pragmas = sqlite_pragmas()
+    replica_engines = [
+        create_engine(url, **engine_options(url)) for url in replica_urls if url
+    ]
+    engine = create_engine(db_url, **engine_options(db_url))
+    for _engine in (engine, *replica_engines):
+        event.listen(_engine, "connect", configure_sqlite)
+    db_session.configure(bind=engine)
+    return engine
+
+
+def get_engine() -> Engine:
+    return engine if engine is not None else init_engine()
+
+
+def all_engines() -> list[Engine]:
+    return [get_engine(), *replica_engines]
+
+
+class RoutingSession(Session):
+    """Send plain SELECTs to a replica until the session writes anything.
+
+    Each session sticks to one randomly chosen replica, so a request never
+    mixes snapshots from replicas that lag by different amounts. Flushes and
+    INSERT/UPDATE/DELETE statements pin the session to the primary, so reads
+    after a write in the same request see that write.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):  # noqa: ARG002
+        primary = get_engine()
+        if self._flushing or (clause is not None and clause.is_dml):
+            self.info["use_primary"] = True
+        elif (
+            replica_engines
+            and isinstance(clause, Select)
+            and not self.info.get("use_primary")
+        ):
+            if "replica" not in self.info:
+                self.info["replica"] = random.choice(replica_engines)
+            return self.info["replica"]
+        return primary
+
+
+def use_primary() -> None:
+    """Route the rest of the current session to the primary."""
+    db_session.info["use_primary"] = True
+
+
+db_session = scoped_session(
+    sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False)
+)
@@ -1,14 +1,158 @@
+import argparse
+import multiprocessing
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal
+
+from sqlalchemy import Engine, create_engine, insert
 from sqlalchemy.orm import Session
 
 from config import Config
-from .connection import engine
+from . import search
+from .cache import seed_versions
+from .connection import get_engine
+from .migrations import stamp
 from .models import Base, Category, Product
 
+# fmt: off
+BRANDS = [
+    "Acer", "Apple", "Asus", "Bose", "Canon", "Dell", "Google", "HP", "JBL",
+    "Lenovo", "LG", "Logitech", "Microsoft", "Nikon", "Nintendo", "Panasonic",
+    "Philips", "Samsung", "Sony", "Xiaomi",
+]
+PRODUCT_TYPES = [
+    ("Laptop", 499, 3499),
+    ("Smartphone", 199, 1599),
+    ("Tablet", 149, 1299),
+    ("Monitor", 129, 1499),
+    ("Headphones", 29, 549),
+    ("Speaker", 39, 899),
+    ("TV", 299, 4999),
+    ("Console", 199, 699),
+    ("Camera", 299, 3999),
+    ("Smartwatch", 99, 899),
+    ("Router", 39, 499),
+    ("Keyboard", 19, 249),
+]
+SERIES = ["Air", "Lite", "Max", "Mini", "Neo", "Plus", "Pro", "S", "Ultra", "X"]
+FEATURES = [
+    "a long-lasting battery", "fast charging", "Wi-Fi 6E", "an OLED display",
+    "active noise cancelling", "a metal unibody", "a two-year warranty",
+    "Bluetooth 5.3", "voice assistant support", "a high refresh rate",
+]
+CATEGORY_NAMES = [
+    "Computers & Laptops", "Phones & Tablets", "TVs & Audio", "Gaming",
+    "Home Appliances", "Cameras", "Wearables", "Networking", "Accessories",
+    "Smart Home", "Monitors", "Office",
+]
+# fmt: on
+
 
-def main() -> None:
+def reset_schema(engine: Engine) -> None:
     Base.metadata.drop_all(engine)
     Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        seed_versions(conn)
+        stamp(conn)
+
+
+def generate_categories(count: int) -> list[dict]:
+    rows = [
+        {
+            "name": Config.DEFAULT_CATEGORY_NAME,
+            "description": "Default category for uncategorized products",
+        }
+    ]
+    for i in range(1, count):
+        name = CATEGORY_NAMES[(i - 1) % len(CATEGORY_NAMES)]
+        if i > len(CATEGORY_NAMES):
+            name = f"{name} {(i - 1) // len(CATEGORY_NAMES) + 1}"
+        rows.append({"name": name, "description": f"Generated category: {name}"})
+    return rows
+
+
+def generate_products(start: int, stop: int, categories: int, seed: int) -> list[dict]:
+    # Seeding by batch start keeps the data identical for any worker count.
+    rng = random.Random(seed * 1_000_003 + start)
+    rows = []
+    for i in range(start, stop):
+        brand = rng.choice(BRANDS)
+        kind, low, high = rng.choice(PRODUCT_TYPES)
+        series = rng.choice(SERIES)
+        features = " and ".join(rng.sample(FEATURES, 2))
+        rows.append(
+            {
+                "name": f"{brand} {kind} {series} {i + 1}",
+                "description": f"{series} {kind.lower()} by {brand} with {features}.",
+                "price": Decimal(f"{rng.uniform(low, high):.2f}"),
+                "stock": int(rng.expovariate(1 / 40)),
+                "category_id": rng.randint(1, categories),
+            }
+        )
+    return rows
+
+
+_worker_engine: Engine | None = None
+
+
+def _init_worker(url: str) -> None:
+    global _worker_engine
+    _worker_engine = create_engine(url)
+
 
+def _insert_batch(start: int, stop: int, categories: int, seed: int) -> int:
+    rows = generate_products(start, stop, categories, seed)
+    with _worker_engine.begin() as conn:
+        conn.execute(insert(Product), rows)
+    return len(rows)
+
+
+def seed_catalog(
+    engine: Engine,
+    products: int,
+    categories: int = 12,
+    seed: int = 0,
+    batch_size: int = 10_000,
+    workers: int = 1,
+) -> None:
+    categories = max(1, categories)
+    ranges = [
+        (start, min(start + batch_size, products))
+        for start in range(0, products, batch_size)
+    ]
+
+    # The search index is rebuilt once after loading instead of row by row.
+    with engine.begin() as conn:
+        conn.execute(insert(Category), generate_categories(categories))
+        search.suspend(conn)
+
+    if workers <= 1 or engine.dialect.name == "sqlite":
+        with engine.begin() as conn:
+            for start, stop in ranges:
+                conn.execute(
+                    insert(Product), generate_products(start, stop, categories, seed)
+                )
+    else:
+        url = engine.url.render_as_string(hide_password=False)
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(url,),
+        ) as pool:
+            futures = [
+                pool.submit(_insert_batch, start, stop, categories, seed)
+                for start, stop in ranges
+            ]
+            for future in futures:
+                future.result()
+
+    with engine.begin() as conn:
+        search.install(conn)
+
+
+def populate_demo() -> None:
     categories_data = [
         (Config.DEFAULT_CATEGORY_NAME, "Default category for uncategorized products"),
         ("Computers & Laptops", "Desktops, laptops, and accessories"),
@@ -52,7 +196,7 @@ def main() -> None:
     ]
     # fmt: on
 
-    with Session(engine) as session:
+    with Session(get_engine()) as session:
         for name, description in categories_data:
             category = Category(name=name, description=description)
             session.add(category)
@@ -71,5 +215,41 @@ def main() -> None:
     print("Database populated with initial data.")
 
 
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Recreate the schema and load demo or generated data."
+    )
+    parser.add_argument(
+        "--products", type=int, help="generate this many products instead of demo data"
+    )
+    parser.add_argument("--categories", type=int, default=12)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument(
+        "--workers", type=int, default=1, help="parallel loaders (not used on SQLite)"
+    )
+    args = parser.parse_args(argv)
+
+    engine = get_engine()
+    reset_schema(engine)
+    if args.products is None:
+        populate_demo()
+        return
+
+    start = time.perf_counter()
+    seed_catalog(
+        engine,
+        args.products,
+        categories=args.categories,
+        seed=args.seed,
+        batch_size=args.batch_size,
+        workers=args.workers,
+    )
+    print(
+        f"Database seeded with {args.products} products in {args.categories} "
+        f"categories in {time.perf_counter() - start:.1f}s."
+    )
+
+
 if __name__ == "__main__":
     main()
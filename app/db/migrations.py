@@ -0,0 +1,136 @@
+import argparse
+from typing import Callable
+
+from sqlalchemy import (
+    Column,
+    Connection,
+    DateTime,
+    Engine,
+    Integer,
+    Table,
+    func,
+    inspect,
+    select,
+    text,
+)
+
+from . import search
+from .cache import seed_versions
+from .models import Base, CacheVersion, Change, Product
+
+schema_migrations = Table(
+    "schema_migrations",
+    Base.metadata,
+    Column("version", Integer, primary_key=True),
+    Column("applied_at", DateTime, server_default=func.now()),
+)
+
+
+def _index(table: Table, name: str):
+    return next(index for index in table.indexes if index.name == name)
+
+
+def add_product_indexes(conn: Connection) -> None:
+    for name in ("ix_products_name_id", "ix_products_category_id_name_id"):
+        _index(Product.__table__, name).create(conn, checkfirst=True)
+
+
+def add_cache_versions(conn: Connection) -> None:
+    CacheVersion.__table__.create(conn, checkfirst=True)
+    seed_versions(conn)
+
+
+def add_category_totals_index(conn: Connection) -> None:
+    _index(Product.__table__, "ix_products_category_id_stock_price").create(
+        conn, checkfirst=True
+    )
+
+
+def add_listing_sort_indexes(conn: Connection) -> None:
+    for name in (
+        "ix_products_price_id",
+        "ix_products_stock_id",
+        "ix_products_category_id_price_id",
+        "ix_products_category_id_stock_id",
+    ):
+        _index(Product.__table__, name).create(conn, checkfirst=True)
+
+
+def add_change_log(conn: Connection) -> None:
+    Change.__table__.create(conn, checkfirst=True)
+
+
+def add_change_txids(conn: Connection) -> None:
+    columns = {column["name"] for column in inspect(conn).get_columns("changes")}
+    if "txid" not in columns:
+        txid = Change.__table__.c.txid.type.compile(conn.dialect)
+        conn.execute(
+            text(f"ALTER TABLE changes ADD COLUMN txid {txid} NOT NULL DEFAULT 0")
+        )
+    _index(Change.__table__, "ix_changes_txid_id").create(conn, checkfirst=True)
+
+
+MIGRATIONS: list[tuple[int, str, Callable[[Connection], None]]] = [
+    (1, "Index products by name and by category", add_product_indexes),
+    (2, "Add cache version counters", add_cache_versions),
+    (3, "Add product full-text search index", search.install),
+    (4, "Cover category totals with a product index", add_category_totals_index),
+    (5, "Index products by price and by stock", add_listing_sort_indexes),
+    (6, "Add catalog change log", add_change_log),
+    (7, "Seed cache version counters", seed_versions),
+    (8, "Order the change log by writing transaction", add_change_txids),
+]
+
+
+def applied_versions(conn: Connection) -> set[int]:
+    schema_migrations.create(conn, checkfirst=True)
+    return set(conn.scalars(select(schema_migrations.c.version)))
+
+
+def stamp(conn: Connection) -> None:
+    done = applied_versions(conn)
+    pending = [{"version": v} for v, _, _ in MIGRATIONS if v not in done]
+    if pending:
+        conn.execute(schema_migrations.insert(), pending)
+
+
+def upgrade(engine: Engine) -> list[int]:
+    with engine.begin() as conn:
+        done = applied_versions(conn)
+
+    applied = []
+    for version, description, migrate in MIGRATIONS:
+        if version in done:
+            continue
+        with engine.begin() as conn:
+            migrate(conn)
+            conn.execute(schema_migrations.insert().values(version=version))
+        print(f"Applied migration {version}: {description}")
+        applied.append(version)
+    return applied
+
+
+def main() -> None:
+    from .connection import get_engine
+
+    parser = argparse.ArgumentParser(description="Apply pending schema migrations.")
+    parser.add_argument(
+        "--list", action="store_true", help="show migration status and exit"
+    )
+    args = parser.parse_args()
+    engine = get_engine()
+
+    if args.list:
+        with engine.begin() as conn:
+            done = applied_versions(conn)
+        for version, description, _ in MIGRATIONS:
+            status = "applied" if version in done else "pending"
+            print(f"{version:>4}  {status:<8} {description}")
+        return
+
+    if not upgrade(engine):
+        print("Database schema is up to date.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,26 @@
 from datetime import datetime
 
-from sqlalchemy import ForeignKey, Integer, Numeric, String, Text, func
+from sqlalchemy import (
+    BigInteger,
+    ForeignKey,
+    Index,
+    Integer,
+    Numeric,
+    String,
+    Text,
+    func,
+)
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
 from config import Config
 
 from decimal import Decimal
 
+# Largest value the Integer columns hold on every supported backend.
+MAX_INT = 2**31 - 1
+# Largest value Product.price (Numeric(10, 2)) can store.
+MAX_PRICE = Decimal("99999999.99")
+
 
 class Base(DeclarativeBase):
     pass
@@ -33,6 +47,15 @@ class Category(Base):
 
 class Product(Base):
     __tablename__ = "products"
+    __table_args__ = (
+        Index("ix_products_name_id", "name", "id"),
+        Index("ix_products_category_id_name_id", "category_id", "name", "id"),
+        Index("ix_products_category_id_stock_price", "category_id", "stock", "price"),
+        Index("ix_products_price_id", "price", "id"),
+        Index("ix_products_stock_id", "stock", "id"),
+        Index("ix_products_category_id_price_id", "category_id", "price", "id"),
+        Index("ix_products_category_id_stock_id", "category_id", "stock", "id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     name: Mapped[str] = mapped_column(String(50), unique=True)
@@ -57,3 +80,32 @@ class Product(Base):
             f"Product(id={self.id!r}, name={self.name!r}, description={self.description!r}, "
             f"price={self.price!r}, stock={self.stock!r}, category_id={self.category_id!r})"
         )
+
+
+class Change(Base):
+    __tablename__ = "changes"
+    __table_args__ = (Index("ix_changes_txid_id", "txid", "id"),)
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    # Id of the writing transaction on Postgres, 0 on SQLite; see changes.py.
+    txid: Mapped[int] = mapped_column(BigInteger, server_default="0")
+    entity: Mapped[str] = mapped_column(String(20))
+    entity_id: Mapped[int]
+    operation: Mapped[str] = mapped_column(String(10))
+    changed_at: Mapped[datetime] = mapped_column(server_default=func.now())
+
+    def __repr__(self) -> str:
+        return (
+            f"Change(id={self.id!r}, entity={self.entity!r}, "
+            f"entity_id={self.entity_id!r}, operation={self.operation!r})"
+        )
+
+
+class CacheVersion(Base):
+    __tablename__ = "cache_versions"
+
+    name: Mapped[str] = mapped_column(String(50), primary_key=True)
+    version: Mapped[int] = mapped_column(default=0)
+
+    def __repr__(self) -> str:
+        return f"CacheVersion(name={self.name!r}, version={self.version!r})"
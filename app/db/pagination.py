@@ -0,0 +1,88 @@
+import base64
+import binascii
+import json
+from decimal import Decimal
+from typing import Any, Callable, NamedTuple, Sequence
+
+from sqlalchemy import Select, tuple_
+from sqlalchemy.orm import InstrumentedAttribute
+
+from .connection import db_session
+from .models import MAX_INT
+
+
+class Page(NamedTuple):
+    items: Sequence[Any]
+    next_cursor: str | None
+    prev_cursor: str | None
+    # True when the query stopped at a cap and more rows matched.
+    truncated: bool = False
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    raw = json.dumps(list(values), separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def _cast(cast: type, value: Any) -> Any:
+    result = cast(value)
+    if isinstance(result, Decimal) and not result.is_finite():
+        raise ValueError(value)
+    if cast is int and not -MAX_INT <= result <= MAX_INT:
+        raise ValueError(value)
+    return result
+
+
+def decode_cursor(cursor: str | None, types: Sequence[type]) -> tuple | None:
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (binascii.Error, ValueError):
+        return None
+    if not isinstance(values, list) or len(values) != len(types):
+        return None
+    try:
+        return tuple(_cast(cast, value) for cast, value in zip(types, values))
+    except (ArithmeticError, TypeError, ValueError):
+        return None
+
+
+def keyset_page(
+    stmt: Select,
+    keys: Sequence[InstrumentedAttribute],
+    row_type: Callable[..., Any] | None,
+    after: tuple | None = None,
+    before: tuple | None = None,
+    limit: int = 24,
+    descending: bool = False,
+) -> Page:
+    key = tuple_(*keys)
+    # Scan against the display order when paging back; rows are reversed below.
+    backwards = (before is not None) != descending
+    if before is not None:
+        bound = tuple_(*before)
+        stmt = stmt.where(key > bound if descending else key < bound)
+    elif after is not None:
+        bound = tuple_(*after)
+        stmt = stmt.where(key < bound if descending else key > bound)
+    stmt = stmt.order_by(*(k.desc() if backwards else k.asc() for k in keys))
+
+    rows = db_session.execute(stmt.limit(limit + 1))
+    items = [row_type(*row) for row in rows] if row_type else rows.all()
+    has_more = len(items) > limit
+    items = items[:limit]
+    if before is not None:
+        items.reverse()
+
+    def cursor_for(item):
+        return encode_cursor([getattr(item, k.key) for k in keys])
+
+    next_cursor = prev_cursor = None
+    if items:
+        if has_more or before is not None:
+            next_cursor = cursor_for(items[-1])
+        if after is not None or (before is not None and has_more):
+            prev_cursor = cursor_for(items[0])
+    return Page(items, next_cursor, prev_cursor)
@@ -1,42 +1,272 @@
 from decimal import Decimal
-from typing import Sequence
+from typing import Iterator, Sequence
 
-from sqlalchemy import func, select
+from sqlalchemy import Row, Select, case, delete, func, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import joinedload
 
-from .connection import db_session
-from .models import Category, Product
+from config import Config
 
+from .cache import CATEGORIES, PRODUCTS, VersionedCache, bump_version, get_versions
+from .changes import (
+    CATEGORY,
+    DELETE,
+    PRODUCT,
+    UPSERT,
+    record_changes,
+    record_changes_where,
+)
+from .connection import db_session, use_primary
+from .models import MAX_INT, Category, Product
+from .pagination import Page, encode_cursor, keyset_page
+from .rows import CategoryRow, CategorySummary, ProductSummary
+from .search import MIN_PREFIX_LENGTH, matching, ranked_search, search_terms
 
-def get_all_categories() -> Sequence[Category]:
-    stmt = select(Category).order_by(Category.name.asc())
-    return db_session.scalars(stmt).all()
+CATEGORY_COLUMNS = (Category.id, Category.name, Category.description)
+PRODUCT_SUMMARY_COLUMNS = (Product.id, Product.name, Product.price, Product.stock)
+PRODUCT_EXPORT_COLUMNS = (
+    Product.id,
+    Product.name,
+    Product.description,
+    Product.price,
+    Product.stock,
+    Product.category_id,
+)
 
+PRODUCT_API_FIELDS = {
+    column.key: column
+    for column in (
+        Product.id,
+        Product.name,
+        Product.description,
+        Product.price,
+        Product.stock,
+        Product.category_id,
+        Product.created_at,
+        Product.updated_at,
+    )
+}
+CATEGORY_API_FIELDS = {column.key: column for column in CATEGORY_COLUMNS}
 
-def get_category_by_id(category_id: int) -> Category | None:
-    return db_session.get(Category, category_id)
+# Sort key -> (column, descending). Each one pairs with an (x, id) index.
+PRODUCT_SORTS = {
+    "name": (Product.name, False),
+    "price": (Product.price, False),
+    "-price": (Product.price, True),
+    "stock": (Product.stock, False),
+    "-stock": (Product.stock, True),
+}
 
+category_cache = VersionedCache(CATEGORIES)
+category_summary_cache = VersionedCache(CATEGORIES, PRODUCTS)
 
-def get_all_products() -> Sequence[Product]:
-    stmt = select(Product).order_by(Product.name.asc())
-    return db_session.scalars(stmt).all()
 
+def _load_all_categories() -> tuple[CategoryRow, ...]:
+    stmt = select(*CATEGORY_COLUMNS).order_by(Category.name.asc())
+    return tuple(CategoryRow(*row) for row in db_session.execute(stmt))
+
+
+def _load_category(category_id: int) -> CategoryRow | None:
+    stmt = select(*CATEGORY_COLUMNS).where(Category.id == category_id)
+    row = db_session.execute(stmt).first()
+    return CategoryRow(*row) if row else None
+
+
+def get_all_categories() -> Sequence[CategoryRow]:
+    return category_cache.get("all", _load_all_categories)
 
-def get_product_by_id(product_id: int) -> Product | None:
-    return db_session.get(Product, product_id)
 
+def get_category_by_id(category_id: int) -> CategoryRow | None:
+    return category_cache.get(("id", category_id), lambda: _load_category(category_id))
 
-def get_product_count_by_category(category_id: int) -> int:
+
+def _load_category_summaries() -> tuple[CategorySummary, ...]:
+    totals = (
+        select(
+            Product.category_id,
+            func.count().label("product_count"),
+            func.sum(Product.stock).label("total_stock"),
+            func.sum(Product.price * Product.stock).label("inventory_value"),
+        )
+        .group_by(Product.category_id)
+        .subquery()
+    )
     stmt = (
-        select(func.count())
-        .select_from(Product)
-        .where(Product.category_id == category_id)
+        select(
+            Category.id,
+            Category.name,
+            func.coalesce(totals.c.product_count, 0),
+            func.coalesce(totals.c.total_stock, 0),
+            func.coalesce(totals.c.inventory_value, 0),
+        )
+        .outerjoin(totals, totals.c.category_id == Category.id)
+        .order_by(Category.name.asc())
     )
-    return db_session.scalar(stmt)
+    cents = Decimal("0.01")
+    return tuple(
+        CategorySummary(*row[:4], Decimal(row[4]).quantize(cents))
+        for row in db_session.execute(stmt)
+    )
+
+
+def get_category_summaries() -> Sequence[CategorySummary]:
+    return category_summary_cache.get("all", _load_category_summaries)
+
+
+def filter_products(
+    stmt: Select,
+    category_id: int | None = None,
+    min_price: Decimal | None = None,
+    max_price: Decimal | None = None,
+    min_stock: int | None = None,
+    max_stock: int | None = None,
+) -> Select:
+    if category_id is not None:
+        stmt = stmt.where(Product.category_id == category_id)
+    if min_price is not None:
+        stmt = stmt.where(Product.price >= min_price)
+    if max_price is not None:
+        stmt = stmt.where(Product.price <= max_price)
+    if min_stock is not None:
+        stmt = stmt.where(Product.stock >= min_stock)
+    if max_stock is not None:
+        stmt = stmt.where(Product.stock <= max_stock)
+    return stmt
+
+
+def get_products_page(
+    category_id: int | None = None,
+    after: tuple | None = None,
+    before: tuple | None = None,
+    limit: int = 24,
+    sort: str = "name",
+    **filters,
+) -> Page:
+    column, descending = PRODUCT_SORTS[sort]
+    stmt = filter_products(select(*PRODUCT_SUMMARY_COLUMNS), category_id, **filters)
+    keys = (column, Product.id)
+    return keyset_page(
+        stmt, keys, ProductSummary, after, before, limit, descending=descending
+    )
+
+
+def search_products(
+    query: str,
+    after: tuple[int] | None = None,
+    before: tuple[int] | None = None,
+    limit: int = 24,
+) -> Page:
+    terms = search_terms(query)
+    if not terms:
+        return Page([], None, None)
+
+    if after is not None:
+        offset = max(0, after[0])
+    elif before is not None:
+        offset = max(0, before[0] - limit)
+    else:
+        offset = 0
+
+    dialect = db_session.get_bind().dialect.name
+    # A prefix match reads the index entries of every word it covers, so the
+    # last term is only expanded when it matches no whole word, i.e. when it
+    # is still being typed.
+    expand = (
+        len(terms[-1]) >= MIN_PREFIX_LENGTH
+        and db_session.scalar(matching(dialect, terms, 1, expand=False)) is None
+    )
+    max_candidates = Config.SEARCH_MAX_CANDIDATES
+    stmt = ranked_search(
+        dialect, PRODUCT_SUMMARY_COLUMNS, terms, max_candidates, expand
+    )
+    rows = db_session.execute(stmt.offset(offset).limit(limit + 1)).all()
+    items = [ProductSummary(*row) for row in rows[:limit]]
+    next_cursor = encode_cursor([offset + limit]) if len(rows) > limit else None
+    prev_cursor = encode_cursor([offset]) if offset > 0 else None
+    truncated = False
+    if next_cursor is None and offset + len(items) == max_candidates:
+        # The candidates stopped at the cap; check whether more rows matched.
+        matched = matching(dialect, terms, max_candidates + 1, expand).subquery()
+        count = db_session.scalar(select(func.count()).select_from(matched))
+        truncated = count > max_candidates
+    return Page(items, next_cursor, prev_cursor, truncated)
+
+
+def iter_products(
+    category_id: int | None = None, batch_size: int = 1000
+) -> Iterator[Row]:
+    stmt = select(*PRODUCT_EXPORT_COLUMNS).order_by(Product.id)
+    if category_id is not None:
+        stmt = stmt.where(Product.category_id == category_id)
+    yield from db_session.execute(stmt.execution_options(yield_per=batch_size))
+
+
+def _api_select(available: dict, fields: Sequence[str], keys: Sequence) -> Select:
+    # Keyset columns are always selected so cursors can be built from any projection.
+    columns = [available[field] for field in fields]
+    columns += [key for key in keys if key.key not in fields]
+    return select(*columns)
+
+
+def get_products_by_ids(ids: Sequence[int], fields: Sequence[str]) -> list[Row]:
+    stmt = (
+        _api_select(PRODUCT_API_FIELDS, fields, (Product.id,))
+        .where(Product.id.in_(ids))
+        .order_by(Product.id)
+    )
+    return db_session.execute(stmt).all()
+
+
+def get_products_api_page(
+    fields: Sequence[str],
+    category_id: int | None = None,
+    after: tuple | None = None,
+    before: tuple | None = None,
+    limit: int = 24,
+    sort: str = "name",
+    **filters,
+) -> Page:
+    column, descending = PRODUCT_SORTS[sort]
+    keys = (column, Product.id)
+    stmt = _api_select(PRODUCT_API_FIELDS, fields, keys)
+    stmt = filter_products(stmt, category_id, **filters)
+    return keyset_page(stmt, keys, None, after, before, limit, descending=descending)
+
+
+def get_categories_by_ids(ids: Sequence[int], fields: Sequence[str]) -> list[Row]:
+    stmt = (
+        _api_select(CATEGORY_API_FIELDS, fields, (Category.id,))
+        .where(Category.id.in_(ids))
+        .order_by(Category.id)
+    )
+    return db_session.execute(stmt).all()
+
+
+def get_categories_api_page(
+    fields: Sequence[str],
+    after: tuple[str, int] | None = None,
+    before: tuple[str, int] | None = None,
+    limit: int = 24,
+) -> Page:
+    keys = (Category.name, Category.id)
+    stmt = _api_select(CATEGORY_API_FIELDS, fields, keys)
+    return keyset_page(stmt, keys, None, after, before, limit)
+
+
+def get_catalog_version() -> tuple[int, ...]:
+    return get_versions(CATEGORIES, PRODUCTS)
+
+
+def get_product_by_id(product_id: int) -> Product | None:
+    return db_session.get(Product, product_id, options=[joinedload(Product.category)])
 
 
 def add_category(name: str, description: str) -> None:
     category = Category(name=name, description=description)
     db_session.add(category)
+    db_session.flush()
+    record_changes(CATEGORY, UPSERT, [category.id])
+    bump_version(CATEGORIES)
     db_session.commit()
 
 
@@ -55,15 +285,50 @@ def add_product(
         category_id=category_id,
     )
     db_session.add(product)
+    db_session.flush()
+    record_changes(PRODUCT, UPSERT, [product.id])
+    bump_version(PRODUCTS)
+    db_session.commit()
+
+
+def insert_products(rows: Sequence[dict], upsert: bool = False) -> set[str]:
+    dialect = db_session.get_bind().dialect.name
+    insert = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}[dialect]
+    stmt = insert(Product)
+    if upsert:
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Product.name],
+            set_={
+                "description": stmt.excluded.description,
+                "price": stmt.excluded.price,
+                "stock": stmt.excluded.stock,
+                "category_id": stmt.excluded.category_id,
+                "updated_at": func.now(),
+            },
+        )
+    else:
+        stmt = stmt.on_conflict_do_nothing(index_elements=[Product.name])
+    result = db_session.execute(stmt.returning(Product.id, Product.name), rows)
+    written = dict(result.tuples().all())
+    if written:
+        record_changes(PRODUCT, UPSERT, written)
+        bump_version(PRODUCTS)
     db_session.commit()
+    return set(written.values())
 
 
-def update_category(category_id: int, name: str, description: str) -> None:
-    category = db_session.get(Category, category_id)
-    if category:
-        category.name = name
-        category.description = description
-        db_session.commit()
+def update_category(category_id: int, name: str, description: str) -> bool:
+    stmt = (
+        update(Category)
+        .where(Category.id == category_id)
+        .values(name=name, description=description)
+    )
+    updated = db_session.execute(stmt).rowcount > 0
+    if updated:
+        record_changes(CATEGORY, UPSERT, [category_id])
+        bump_version(CATEGORIES)
+    db_session.commit()
+    return updated
 
 
 def update_product(
@@ -73,26 +338,143 @@ def update_product(
     price: Decimal,
     stock: int,
     category_id: int,
-) -> None:
-    product = db_session.get(Product, product_id)
-    if product:
-        product.name = name
-        product.description = description
-        product.price = price
-        product.stock = stock
-        product.category_id = category_id
-        db_session.commit()
-
-
-def delete_category(category_id: int) -> None:
-    category = db_session.get(Category, category_id)
-    if category:
-        db_session.delete(category)
-        db_session.commit()
-
-
-def delete_product(product_id: int) -> None:
-    product = db_session.get(Product, product_id)
-    if product:
-        db_session.delete(product)
-        db_session.commit()
+) -> bool:
+    stmt = (
+        update(Product)
+        .where(Product.id == product_id)
+        .values(
+            name=name,
+            description=description,
+            price=price,
+            stock=stock,
+            category_id=category_id,
+        )
+    )
+    updated = db_session.execute(stmt).rowcount > 0
+    if updated:
+        record_changes(PRODUCT, UPSERT, [product_id])
+        bump_version(PRODUCTS)
+    db_session.commit()
+    return updated
+
+
+def _commit_stock_movement() -> None:
+    # Every stock movement bumps the same version row. Bumping it in a
+    # transaction of its own holds that row lock for one statement rather than
+    # for the whole movement. Caches may serve the old stock until then.
+    db_session.commit()
+    bump_version(PRODUCTS)
+    db_session.commit()
+
+
+def adjust_stock(product_id: int, delta: int) -> int | None:
+    stmt = (
+        update(Product)
+        # Bounds are computed here so the database never evaluates an overflow.
+        .where(
+            Product.id == product_id,
+            Product.stock >= -delta,
+            Product.stock <= MAX_INT - delta,
+        )
+        .values(stock=Product.stock + delta)
+        .returning(Product.stock)
+    )
+    stock = db_session.scalar(stmt)
+    if stock is None:
+        db_session.rollback()
+        return None
+    record_changes(PRODUCT, UPSERT, [product_id])
+    _commit_stock_movement()
+    return stock
+
+
+def reserve_stock(deltas: dict[int, int]) -> tuple[dict[int, int], list[int]]:
+    change = case(deltas, value=Product.id, else_=0)
+    floor = case({id_: -delta for id_, delta in deltas.items()}, value=Product.id)
+    ceiling = case(
+        {id_: MAX_INT - delta for id_, delta in deltas.items()}, value=Product.id
+    )
+    stmt = (
+        update(Product)
+        .where(Product.id.in_(deltas), Product.stock >= floor, Product.stock <= ceiling)
+        .values(stock=Product.stock + change)
+        .returning(Product.id, Product.stock)
+    )
+    updated = dict(db_session.execute(stmt).tuples().all())
+    failed = sorted(set(deltas) - set(updated))
+    if failed:
+        db_session.rollback()
+        return {}, failed
+    record_changes(PRODUCT, UPSERT, updated)
+    _commit_stock_movement()
+    return updated, []
+
+
+def bulk_update_products(
+    changes: dict[int, dict],
+) -> tuple[dict[int, tuple[Decimal, int]], list[int]]:
+    """Apply price/stock edits in one UPDATE, or nothing if any id is missing."""
+    values = {}
+    for column in (Product.price, Product.stock):
+        new = {
+            product_id: change[column.key]
+            for product_id, change in changes.items()
+            if change.get(column.key) is not None
+        }
+        if new:
+            values[column.key] = case(new, value=Product.id, else_=column)
+    stmt = (
+        update(Product)
+        .where(Product.id.in_(changes))
+        .values(values)
+        .returning(Product.id, Product.price, Product.stock)
+    )
+    updated = {
+        product_id: (price, stock)
+        for product_id, price, stock in db_session.execute(stmt)
+    }
+    missing = sorted(set(changes) - set(updated))
+    if missing:
+        db_session.rollback()
+        return {}, missing
+    record_changes(PRODUCT, UPSERT, updated)
+    bump_version(PRODUCTS)
+    db_session.commit()
+    return updated, []
+
+
+def delete_category(category_id: int) -> int | None:
+    record_changes_where(
+        PRODUCT, UPSERT, Product.id, Product.category_id == category_id
+    )
+    reassign = (
+        update(Product)
+        .where(Product.category_id == category_id)
+        .values(category_id=Config.DEFAULT_CATEGORY_ID)
+    )
+    moved = db_session.execute(reassign).rowcount
+    stmt = delete(Category).where(Category.id == category_id)
+    if db_session.execute(stmt).rowcount == 0:
+        db_session.rollback()
+        return None
+    record_changes(CATEGORY, DELETE, [category_id])
+    bump_version(CATEGORIES, PRODUCTS)
+    db_session.commit()
+    return moved
+
+
+def delete_product(product_id: int) -> int | None:
+    stmt = delete(Product).where(Product.id == product_id)
+    if db_session.get_bind().dialect.delete_returning:
+        category_id = db_session.scalar(stmt.returning(Product.category_id))
+    else:
+        use_primary()
+        category_id = db_session.scalar(
+            select(Product.category_id).where(Product.id == product_id)
+        )
+        db_session.execute(stmt)
+    if category_id is not None:
+        record_changes(PRODUCT, DELETE, [product_id])
+        bump_version(PRODUCTS)
+    db_session.commit()
+    return category_id
@@ -0,0 +1,26 @@
+from dataclasses import dataclass
+from decimal import Decimal
+
+
+@dataclass(frozen=True, slots=True)
+class CategoryRow:
+    id: int
+    name: str
+    description: str
+
+
+@dataclass(frozen=True, slots=True)
+class CategorySummary:
+    id: int
+    name: str
+    product_count: int
+    total_stock: int
+    inventory_value: Decimal
+
+
+@dataclass(frozen=True, slots=True)
+class ProductSummary:
+    id: int
+    name: str
+    price: Decimal
+    stock: int
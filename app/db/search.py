@@ -0,0 +1,178 @@
+import re
+
+from sqlalchemy import (
+    DDL,
+    Connection,
+    Select,
+    case,
+    column,
+    event,
+    func,
+    literal,
+    literal_column,
+    select,
+    table,
+    text,
+    union_all,
+)
+
+from .models import Product
+
+# Shorter final terms match whole words only; as prefixes they hit most rows.
+MIN_PREFIX_LENGTH = 3
+
+products_fts = table("products_fts", column("rowid"), column("products_fts"))
+
+SQLITE_DDL = [
+    DDL(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5("
+        "name, description, content='products', content_rowid='id', "
+        "tokenize='unicode61 remove_diacritics 2')"
+    ),
+    DDL(
+        "CREATE TRIGGER IF NOT EXISTS products_fts_ai AFTER INSERT ON products BEGIN "
+        "INSERT INTO products_fts(rowid, name, description) "
+        "VALUES (new.id, new.name, new.description); END"
+    ),
+    DDL(
+        "CREATE TRIGGER IF NOT EXISTS products_fts_ad AFTER DELETE ON products BEGIN "
+        "INSERT INTO products_fts(products_fts, rowid, name, description) "
+        "VALUES ('delete', old.id, old.name, old.description); END"
+    ),
+    DDL(
+        "CREATE TRIGGER IF NOT EXISTS products_fts_au "
+        "AFTER UPDATE OF name, description ON products BEGIN "
+        "INSERT INTO products_fts(products_fts, rowid, name, description) "
+        "VALUES ('delete', old.id, old.name, old.description); "
+        "INSERT INTO products_fts(rowid, name, description) "
+        "VALUES (new.id, new.name, new.description); END"
+    ),
+]
+
+POSTGRES_DDL = [
+    DDL(
+        "ALTER TABLE products ADD COLUMN IF NOT EXISTS search_vector tsvector "
+        "GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(description, '')), 'B')"
+        ") STORED"
+    ),
+    DDL(
+        "CREATE INDEX IF NOT EXISTS ix_products_search_vector "
+        "ON products USING GIN (search_vector)"
+    ),
+]
+
+for ddl in SQLITE_DDL:
+    event.listen(Product.__table__, "after_create", ddl.execute_if(dialect="sqlite"))
+for ddl in POSTGRES_DDL:
+    event.listen(
+        Product.__table__, "after_create", ddl.execute_if(dialect="postgresql")
+    )
+event.listen(
+    Product.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS products_fts").execute_if(dialect="sqlite"),
+)
+
+
+def install(conn: Connection) -> None:
+    if conn.dialect.name == "sqlite":
+        for ddl in SQLITE_DDL:
+            conn.execute(ddl)
+        conn.execute(text("INSERT INTO products_fts(products_fts) VALUES ('rebuild')"))
+    elif conn.dialect.name == "postgresql":
+        for ddl in POSTGRES_DDL:
+            conn.execute(ddl)
+
+
+def suspend(conn: Connection) -> None:
+    if conn.dialect.name == "sqlite":
+        for trigger in ("products_fts_ai", "products_fts_ad", "products_fts_au"):
+            conn.execute(text(f"DROP TRIGGER IF EXISTS {trigger}"))
+    elif conn.dialect.name == "postgresql":
+        conn.execute(text("DROP INDEX IF EXISTS ix_products_search_vector"))
+
+
+def search_terms(query: str) -> list[str]:
+    return re.findall(r"\w+", query)
+
+
+def _tsquery(terms: list[str], expand: bool, weight: str = ""):
+    labels = [weight] * (len(terms) - 1) + [("*" if expand else "") + weight]
+    query = " & ".join(
+        f"{term}:{label}" if label else term for term, label in zip(terms, labels)
+    )
+    return func.to_tsquery("english", query)
+
+
+def matching(
+    dialect: str, terms: list[str], limit: int, expand: bool, name_only: bool = False
+) -> Select:
+    """Ids of up to ``limit`` rows matching every term, in no particular order.
+
+    With ``expand`` the last term, the one still being typed, also matches
+    as a prefix. With ``name_only`` every term must match in the name.
+    """
+    if dialect == "sqlite":
+        match = " ".join(f'"{term}"' for term in terms) + ("*" if expand else "")
+        if name_only:
+            match = f"name : ({match})"
+        return (
+            select(products_fts.c.rowid.label("id"))
+            .where(products_fts.c.products_fts.op("MATCH")(match))
+            .limit(limit)
+        )
+
+    # Names are indexed with weight A, descriptions with weight B.
+    query = _tsquery(terms, expand, "A" if name_only else "")
+    search_vector = literal_column("products.search_vector")
+    return select(Product.id).where(search_vector.op("@@")(query)).limit(limit)
+
+
+def candidates(
+    dialect: str, terms: list[str], max_candidates: int, expand: bool = False
+) -> Select:
+    """Ids of up to ``max_candidates`` rows matching every term.
+
+    Rows whose name matches every term are taken first, so a common word
+    ranks its name matches rather than whichever rows the index reaches first.
+    """
+    tiers = [
+        matching(dialect, terms, max_candidates, expand, name_only=True),
+        matching(dialect, terms, max_candidates, expand),
+    ]
+    tiered = union_all(
+        *(
+            select(ids.c.id, literal(tier).label("tier"))
+            for tier, ids in enumerate(stmt.subquery() for stmt in tiers)
+        )
+    ).subquery()
+    return (
+        select(tiered.c.id)
+        .group_by(tiered.c.id)
+        .order_by(func.min(tiered.c.tier), tiered.c.id)
+        .limit(max_candidates)
+    )
+
+
+def ranked_search(
+    dialect: str, columns, terms: list[str], max_candidates: int, expand: bool
+) -> Select:
+    """Rank the candidate rows for ``terms``, name matches first."""
+    matched = candidates(dialect, terms, max_candidates, expand).subquery()
+    stmt = select(*columns).join_from(Product, matched, matched.c.id == Product.id)
+    if dialect == "sqlite":
+        # bm25() first counts every row that matches each term, which costs more
+        # than the search itself for common words. Ranking by words found in
+        # the name, then shorter names, keeps its name-over-description weight.
+        name_words = " " + Product.name
+        name_hits = sum(
+            case((name_words.icontains(f" {term}", autoescape=True), 1), else_=0)
+            for term in terms
+        )
+        return stmt.order_by(name_hits.desc(), func.length(Product.name), Product.id)
+
+    search_vector = literal_column("products.search_vector")
+    rank = func.ts_rank(search_vector, _tsquery(terms, expand))
+    return stmt.order_by(rank.desc(), Product.id)
@@ -0,0 +1,141 @@
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Hashable
+
+from flask import Flask, current_app, request
+from markupsafe import Markup
+
+logger = logging.getLogger(__name__)
+
+PRUNE_EVERY = 256
+
+
+class MemoryStore:
+    """Thread-safe LRU of rendered fragments bounded by their encoded size."""
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, str] = OrderedDict()
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str) -> None:
+        cost = len(value.encode())
+        if cost > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= len(previous.encode())
+            self._entries[key] = value
+            self.size += cost
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted.encode())
+
+
+class DiskStore:
+    """Fragments shared between worker processes through a directory."""
+
+    def __init__(self, directory: str, max_files: int) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_files = max_files
+        self._writes = 0
+
+    def get(self, key: str) -> str | None:
+        try:
+            return (self.directory / f"{key}.html").read_text(encoding="utf-8")
+        except OSError:
+            return None
+
+    def set(self, key: str, value: str) -> None:
+        # Write then rename so other workers never read a partial fragment.
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as file:
+                file.write(value)
+            os.replace(tmp, self.directory / f"{key}.html")
+        except OSError:
+            logger.warning("Could not write fragment %s", key, exc_info=True)
+            Path(tmp).unlink(missing_ok=True)
+            return
+
+        self._writes += 1
+        if self._writes % PRUNE_EVERY == 0:
+            self.prune()
+
+    def prune(self) -> None:
+        entries = []
+        for path in self.directory.glob("*.html"):
+            try:
+                entries.append((path.stat().st_mtime, path))
+            except OSError:
+                continue
+        entries.sort(reverse=True)
+        for _, path in entries[self.max_files :]:
+            path.unlink(missing_ok=True)
+
+
+class FragmentCache:
+    def __init__(self, memory: MemoryStore, disk: DiskStore | None = None) -> None:
+        self.memory = memory
+        self.disk = disk
+
+    def get(self, key: str) -> str | None:
+        value = self.memory.get(key)
+        if value is None and self.disk is not None:
+            value = self.disk.get(key)
+            if value is not None:
+                self.memory.set(key, value)
+        return value
+
+    def set(self, key: str, value: str) -> None:
+        self.memory.set(key, value)
+        if self.disk is not None:
+            self.disk.set(key, value)
+
+
+def init_app(app: Flask) -> None:
+    max_bytes = app.config["FRAGMENT_CACHE_BYTES"]
+    if not max_bytes:
+        return
+
+    disk = None
+    if app.config.get("FRAGMENT_CACHE_DIR"):
+        disk = DiskStore(
+            app.config["FRAGMENT_CACHE_DIR"], app.config["FRAGMENT_CACHE_MAX_FILES"]
+        )
+    app.extensions["fragment_cache"] = FragmentCache(MemoryStore(max_bytes), disk)
+
+
+def cached_fragment(version: Hashable, render: Callable[[], str]) -> Markup:
+    """Render a fragment once per data version and request URL.
+
+    ``version`` must change whenever anything the fragment shows is written;
+    the URL covers the endpoint, view arguments and cursor/query parameters.
+    """
+    cache: FragmentCache | None = current_app.extensions.get("fragment_cache")
+    if cache is None:
+        return Markup(render())
+
+    key = hashlib.sha1(
+        repr((request.endpoint, request.full_path, version)).encode()
+    ).hexdigest()
+    value = cache.get(key)
+    if value is None:
+        value = render()
+        cache.set(key, value)
+    return Markup(value)
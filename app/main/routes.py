@@ -1,17 +1,24 @@
+import math
+
 from flask import (
     Blueprint,
     current_app,
     flash,
+    jsonify,
+    make_response,
     redirect,
     render_template,
+    request,
     session,
     url_for,
 )
 from werkzeug.security import check_password_hash
 
 from .forms import LoginForm
+from .utils import admin_required, page_url
 
 main_bp = Blueprint("main", __name__)
+main_bp.add_app_template_global(page_url)
 
 
 @main_bp.route("/")
@@ -22,23 +29,48 @@ def index():
 @main_bp.route("/login", methods=["GET", "POST"])
 def login():
     form = LoginForm()
+    status = 200
     if form.validate_on_submit():
-        pwhash = current_app.config["ADMIN_PASSWORD_HASH"]
-        password = form.password.data
-        if check_password_hash(pwhash, password):
-            session["is_admin"] = True
-            flash("Logged in successfully.", "success")
-            return redirect(url_for("main.index"))
-        flash("Invalid password.", "error")
-    return render_template(
-        "form.html",
-        form=form,
-        title="Admin Login",
-        button_text="Log In",
-        button_class="btn-primary",
-        cancel_url=url_for("main.index"),
-        action_url=url_for("main.login"),
+        # Throttle before hashing so a burst of bad logins cannot pin the CPU.
+        throttle = current_app.extensions["login_throttle"]
+        retry_after = throttle.check(request.remote_addr)
+        if retry_after is not None:
+            retry_after = math.ceil(retry_after)
+            flash(
+                f"Too many login attempts. Try again in {retry_after} seconds.",
+                "error",
+            )
+            status = 429
+        else:
+            pwhash = current_app.config["ADMIN_PASSWORD_HASH"]
+            password = form.password.data
+            if check_password_hash(pwhash, password):
+                session["is_admin"] = True
+                flash("Logged in successfully.", "success")
+                return redirect(url_for("main.index"))
+            flash("Invalid password.", "error")
+
+    response = make_response(
+        render_template(
+            "form.html",
+            form=form,
+            title="Admin Login",
+            button_text="Log In",
+            button_class="btn-primary",
+            cancel_url=url_for("main.index"),
+            action_url=url_for("main.login"),
+        ),
+        status,
     )
+    if status == 429:
+        response.retry_after = retry_after
+    return response
+
+
+@main_bp.route("/login/stats")
+@admin_required
+def login_stats():
+    return jsonify(current_app.extensions["login_throttle"].counters())
 
 
 @main_bp.route("/logout")
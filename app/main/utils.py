@@ -1,6 +1,18 @@
+import hashlib
 from functools import wraps
+from typing import Callable
 
-from flask import abort, session
+from flask import (
+    Response,
+    abort,
+    current_app,
+    make_response,
+    request,
+    session,
+    url_for,
+)
+
+from ..db.pagination import decode_cursor
 
 
 def admin_required(f):
@@ -11,3 +23,38 @@ def admin_required(f):
         return f(*args, **kwargs)
 
     return decorated_function
+
+
+def get_page_args(cursor_types: tuple[type, ...] = (str, int)) -> dict:
+    per_page = request.args.get("per_page", type=int) or current_app.config["PAGE_SIZE"]
+    per_page = max(1, min(per_page, current_app.config["MAX_PAGE_SIZE"]))
+    return {
+        "after": decode_cursor(request.args.get("after"), cursor_types),
+        "before": decode_cursor(request.args.get("before"), cursor_types),
+        "limit": per_page,
+    }
+
+
+def page_url(**cursor) -> str:
+    args = request.args.to_dict()
+    args.pop("after", None)
+    args.pop("before", None)
+    args.update(cursor)
+    return url_for(request.endpoint, **(request.view_args or {}), **args)
+
+
+def conditional_response(render: Callable[[], str], *validator) -> Response:
+    # Admin pages and pending flash messages vary per request, never revalidate them.
+    cacheable = not session.get("is_admin") and not session.get("_flashes")
+    etag = hashlib.sha1(repr((request.full_path, validator)).encode()).hexdigest()
+
+    if cacheable and request.if_none_match.contains_weak(etag):
+        response = current_app.response_class(status=304)
+    else:
+        response = make_response(render())
+    if cacheable:
+        response.set_etag(etag, weak=True)
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+        response.vary.add("Cookie")
+    return response
@@ -0,0 +1,106 @@
+import re
+from typing import Mapping
+
+from werkzeug.datastructures import MultiDict
+
+from ..db import queries
+from ..db.models import MAX_INT
+from .forms import BulkEditRowForm
+
+FIELDS = ("price", "stock")
+
+
+def parse_json(payload) -> list[dict] | None:
+    items = payload.get("items") if isinstance(payload, dict) else None
+    if not isinstance(items, list) or not all(isinstance(i, dict) for i in items):
+        return None
+    return items
+
+
+def parse_form(formdata: Mapping[str, str]) -> list[dict]:
+    """Rows from the grid whose inputs differ from the values they were shown with."""
+    items = []
+    for key in formdata:
+        prefix, _, product_id = key.partition("-")
+        if prefix != "id":
+            continue
+        item = {"id": product_id}
+        for name in FIELDS:
+            value = formdata.get(f"{name}-{product_id}", "").strip()
+            if value != formdata.get(f"original-{name}-{product_id}", ""):
+                item[name] = value
+        if len(item) > 1:
+            items.append(item)
+    return items
+
+
+def validate_row(item: dict, seen: set[int]) -> tuple[int | None, dict, list[str]]:
+    product_id = item.get("id")
+    if isinstance(product_id, str) and re.fullmatch(r"[0-9]+", product_id):
+        product_id = int(product_id)
+    if type(product_id) is not int or not 0 < product_id <= MAX_INT:
+        return None, {}, ["Product id must be an integer."]
+    if product_id in seen:
+        return product_id, {}, ["Product appears more than once."]
+    seen.add(product_id)
+
+    formdata = MultiDict(
+        (name, str(item[name])) for name in FIELDS if item.get(name) not in (None, "")
+    )
+    if not formdata:
+        return product_id, {}, ["Nothing to change."]
+    form = BulkEditRowForm(formdata=formdata, meta={"csrf": False})
+    if not form.validate():
+        errors = [
+            f"{getattr(form, name).label.text}: {error}"
+            for name, messages in form.errors.items()
+            for error in messages
+        ]
+        return product_id, {}, errors
+    return product_id, {name: form[name].data for name in formdata}, []
+
+
+def apply(items: list[dict], max_rows: int) -> tuple[list[dict], int]:
+    """Validate every row, then apply them all in one transaction.
+
+    Returns one result per submitted row and the HTTP status: 400 when any
+    row is invalid, 409 when a product no longer exists (nothing is written
+    in either case), 200 otherwise.
+    """
+    if len(items) > max_rows:
+        return [{"status": "invalid", "errors": [f"At most {max_rows} rows."]}], 400
+
+    seen: set[int] = set()
+    rows = [validate_row(item, seen) for item in items]
+    if any(errors for _, _, errors in rows):
+        results = [
+            {"id": product_id, "status": "invalid", "errors": errors}
+            if errors
+            else {"id": product_id, "status": "valid"}
+            for product_id, _, errors in rows
+        ]
+        return results, 400
+
+    changes = {product_id: change for product_id, change, _ in rows}
+    if not changes:
+        return [], 200
+    updated, missing = queries.bulk_update_products(changes)
+    if missing:
+        results = [
+            {"id": product_id, "status": "not_found"}
+            if product_id in missing
+            else {"id": product_id, "status": "valid"}
+            for product_id in changes
+        ]
+        return results, 409
+
+    results = [
+        {
+            "id": product_id,
+            "status": "updated",
+            "price": updated[product_id][0],
+            "stock": updated[product_id][1],
+        }
+        for product_id in changes
+    ]
+    return results, 200
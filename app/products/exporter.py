@@ -0,0 +1,29 @@
+import csv
+import io
+import json
+from itertools import batched
+from typing import Iterable, Iterator
+
+from sqlalchemy import Row
+
+CHUNK_ROWS = 500
+
+
+def export_csv(rows: Iterable[Row], fields: list[str]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    yield buffer.getvalue()
+
+    for chunk in batched(rows, CHUNK_ROWS):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(chunk)
+        yield buffer.getvalue()
+
+
+def export_jsonl(rows: Iterable[Row], fields: list[str]) -> Iterator[str]:
+    for chunk in batched(rows, CHUNK_ROWS):
+        yield "".join(
+            json.dumps(dict(zip(fields, row)), default=str) + "\n" for row in chunk
+        )
@@ -1,6 +1,28 @@
 from flask_wtf import FlaskForm
-from wtforms import DecimalField, IntegerField, SelectField, StringField, TextAreaField
-from wtforms.validators import DataRequired, InputRequired, Length, NumberRange
+from flask_wtf.file import FileAllowed, FileField, FileRequired
+from wtforms import (
+    BooleanField,
+    DecimalField,
+    IntegerField,
+    SelectField,
+    StringField,
+    TextAreaField,
+)
+from wtforms.validators import (
+    DataRequired,
+    InputRequired,
+    Length,
+    NumberRange,
+    Optional,
+    StopValidation,
+)
+
+from ..db.models import MAX_INT, MAX_PRICE
+
+
+def finite(form, field):  # noqa: ARG001
+    if field.data is not None and not field.data.is_finite():
+        raise StopValidation("Must be a finite number.")
 
 
 class ProductForm(FlaskForm):
@@ -8,8 +30,34 @@ class ProductForm(FlaskForm):
     description = TextAreaField("Description", validators=[DataRequired()])
     price = DecimalField(
         "Price",
-        validators=[InputRequired(), NumberRange(min=0)],
+        validators=[InputRequired(), finite, NumberRange(min=0, max=MAX_PRICE)],
         render_kw={"step": "0.01"},
     )
-    stock = IntegerField("Stock", validators=[InputRequired(), NumberRange(min=0)])
+    stock = IntegerField(
+        "Stock", validators=[InputRequired(), NumberRange(min=0, max=MAX_INT)]
+    )
     category_id = SelectField("Category", validators=[InputRequired()], coerce=int)
+
+
+class ProductImportForm(FlaskForm):
+    file = FileField(
+        "File (CSV or JSONL)",
+        validators=[FileRequired(), FileAllowed(["csv", "jsonl"])],
+    )
+    upsert = BooleanField("Update existing products with the same name")
+
+
+class StockAdjustForm(FlaskForm):
+    delta = IntegerField(
+        "Stock change",
+        validators=[InputRequired(), NumberRange(min=-MAX_INT, max=MAX_INT)],
+    )
+
+
+class BulkEditRowForm(FlaskForm):
+    price = DecimalField(
+        "Price", validators=[Optional(), finite, NumberRange(min=0, max=MAX_PRICE)]
+    )
+    stock = IntegerField(
+        "Stock", validators=[Optional(), NumberRange(min=0, max=MAX_INT)]
+    )
@@ -0,0 +1,109 @@
+import csv
+import json
+import re
+from dataclasses import dataclass, field
+from typing import Iterator, TextIO
+
+from werkzeug.datastructures import MultiDict
+
+from ..db import queries
+from .forms import ProductForm
+
+FIELDS = ("name", "description", "price", "stock", "category_id")
+# Streams are opened with errors="surrogateescape", so undecodable bytes show
+# up as lone surrogates in the affected rows instead of failing the import.
+UNDECODABLE = re.compile("[\udc80-\udcff]")
+
+
+@dataclass
+class ImportResult:
+    imported: int = 0
+    errors: list[tuple[int, str]] = field(default_factory=list)
+
+
+def iter_records(stream: TextIO, fmt: str) -> Iterator[tuple[int, dict | None]]:
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        while True:
+            try:
+                record = next(reader)
+            except StopIteration:
+                return
+            except csv.Error:
+                # The reader has consumed the bad line but not counted it yet.
+                yield reader.line_num + 1, None
+            else:
+                yield reader.line_num, record
+    elif fmt == "jsonl":
+        for line_num, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                record = None
+            yield line_num, record if isinstance(record, dict) else None
+    else:
+        raise ValueError(f"Unsupported import format: {fmt}")
+
+
+def validate_record(record: dict, choices: list[tuple[int, str]]) -> ProductForm:
+    formdata = MultiDict(
+        (name, str(record[name])) for name in FIELDS if record.get(name) is not None
+    )
+    form = ProductForm(formdata=formdata, meta={"csrf": False})
+    form.category_id.choices = choices
+    form.validate()
+    return form
+
+
+def is_text(record: dict) -> bool:
+    return not any(
+        isinstance(value, str) and UNDECODABLE.search(value)
+        for value in (*record.keys(), *record.values())
+    )
+
+
+def import_products(
+    stream: TextIO, fmt: str, upsert: bool = False, batch_size: int = 1000
+) -> ImportResult:
+    result = ImportResult()
+    choices = [(cat.id, cat.name) for cat in queries.get_all_categories()]
+    batch: dict[str, tuple[int, dict]] = {}
+
+    def flush():
+        written = queries.insert_products([row for _, row in batch.values()], upsert)
+        result.imported += len(written)
+        for name, (line_num, _) in batch.items():
+            if name not in written:
+                result.errors.append((line_num, f'Product "{name}" already exists.'))
+        batch.clear()
+
+    for line_num, record in iter_records(stream, fmt):
+        if record is None:
+            result.errors.append((line_num, "Malformed record."))
+            continue
+        if not is_text(record):
+            result.errors.append((line_num, "Record is not valid UTF-8."))
+            continue
+
+        form = validate_record(record, choices)
+        if form.errors:
+            messages = "; ".join(
+                f"{name}: {', '.join(errors)}" for name, errors in form.errors.items()
+            )
+            result.errors.append((line_num, messages))
+            continue
+
+        name = form.name.data
+        if name in batch and not upsert:
+            result.errors.append((line_num, f'Product "{name}" already exists.'))
+            continue
+        batch[name] = (line_num, {field: getattr(form, field).data for field in FIELDS})
+        if len(batch) >= batch_size:
+            flush()
+
+    if batch:
+        flush()
+    result.errors.sort()
+    return result
@@ -1,27 +1,80 @@
+import io
+from pathlib import Path
+
+import click
 from flask import (
     Blueprint,
     current_app,
     flash,
+    jsonify,
     redirect,
     render_template,
     request,
+    stream_with_context,
     url_for,
 )
 from sqlalchemy.exc import IntegrityError
 
 from ..db import queries
+from ..db.models import MAX_INT
+from ..fragments import cached_fragment
 from ..main.forms import DeleteForm
-from ..main.utils import admin_required
-from .forms import ProductForm
-from .utils import handle_product_form
+from ..main.utils import admin_required, conditional_response, get_page_args
+from . import bulk
+from .exporter import export_csv, export_jsonl
+from .forms import ProductForm, ProductImportForm, StockAdjustForm
+from .importer import import_products as run_import
+from .utils import get_category_arg, get_listing_args, handle_product_form
 
 products_bp = Blueprint("products", __name__, url_prefix="/products")
 
 
 @products_bp.route("/")
 def list_products():
-    products = queries.get_all_products()
-    return render_template("products.html", products=products)
+    version = queries.get_catalog_version()
+
+    def render_grid():
+        page = queries.get_products_page(**get_listing_args())
+        return render_template("_product_grid.html", products=page.items, page=page)
+
+    def render():
+        product_grid = cached_fragment(version, render_grid)
+        return render_template(
+            "products.html",
+            product_grid=product_grid,
+            categories=queries.get_all_categories(),
+        )
+
+    return conditional_response(render, version)
+
+
+@products_bp.route("/suggest")
+def suggest_products():
+    prefix = request.args.get("prefix", "").strip()
+    limit = max(1, min(request.args.get("limit", 10, type=int), 25))
+    names = current_app.extensions["typeahead"]
+    matches = names.suggest(prefix, limit) if prefix else []
+    return jsonify(
+        suggestions=[{"id": product_id, "name": name} for product_id, name in matches]
+    )
+
+
+@products_bp.route("/search")
+def search_products():
+    query = request.args.get("q", "").strip()
+    version = queries.get_catalog_version()
+
+    def render_grid():
+        page = queries.search_products(query, **get_page_args(cursor_types=(int,)))
+        return render_template(
+            "_product_grid.html", products=page.items, page=page, query=query
+        )
+
+    def render():
+        product_grid = cached_fragment(version, render_grid)
+        return render_template("products.html", product_grid=product_grid, query=query)
+
+    return conditional_response(render, version)
 
 
 @products_bp.route("/<int:product_id>")
@@ -32,7 +85,13 @@ def view_product(product_id):
         return redirect(url_for("products.list_products"))
 
     delete_form = DeleteForm()
-    return render_template("product.html", product=product, delete_form=delete_form)
+    stock_form = StockAdjustForm()
+    return render_template(
+        "product.html",
+        product=product,
+        delete_form=delete_form,
+        stock_form=stock_form,
+    )
 
 
 @products_bp.route("/add", methods=["GET", "POST"])
@@ -81,17 +140,21 @@ def add_product():
 @products_bp.route("/<int:product_id>/edit", methods=["GET", "POST"])
 @admin_required
 def edit_product(product_id):
-    product = queries.get_product_by_id(product_id)
-    if not product:
-        flash("Product not found.", "error")
-        return redirect(url_for("products.list_products"))
+    product = None
+    if request.method == "GET":
+        product = queries.get_product_by_id(product_id)
+        if not product:
+            flash("Product not found.", "error")
+            return redirect(url_for("products.list_products"))
 
     form = ProductForm()
     data, category_name = handle_product_form(form, product)
 
     if data:
         try:
-            queries.update_product(product_id, **data)
+            if not queries.update_product(product_id, **data):
+                flash("Product not found.", "error")
+                return redirect(url_for("products.list_products"))
             flash(
                 f'Product "{data["name"]}" was successfully updated in the "{category_name}" category.',
                 "success",
@@ -114,13 +177,161 @@ def edit_product(product_id):
 @products_bp.route("/<int:product_id>/delete", methods=["POST"])
 @admin_required
 def delete_product(product_id):
-    product = queries.get_product_by_id(product_id)
-    if product is None:
+    category_id = queries.delete_product(product_id)
+    if category_id is None:
         flash("Product not found.", "error")
         return redirect(url_for("products.list_products"))
 
-    queries.delete_product(product_id)
     flash("Product deleted successfully.", "success")
-    return redirect(
-        url_for("categories.view_category", category_id=product.category_id)
+    return redirect(url_for("categories.view_category", category_id=category_id))
+
+
+@products_bp.route("/import", methods=["GET", "POST"])
+@admin_required
+def import_products():
+    form = ProductImportForm()
+    if form.validate_on_submit():
+        upload = form.file.data
+        fmt = Path(upload.filename).suffix.lstrip(".").lower()
+        stream = io.TextIOWrapper(
+            upload.stream,
+            encoding="utf-8-sig",
+            errors="surrogateescape",
+            newline="",
+        )
+        result = run_import(stream, fmt, upsert=form.upsert.data)
+
+        flash(f"{result.imported} products imported.", "success")
+        for line_num, message in result.errors[:10]:
+            flash(f"Line {line_num}: {message}", "error")
+        if len(result.errors) > 10:
+            flash(f"{len(result.errors) - 10} more rows were rejected.", "error")
+        return redirect(url_for("products.list_products"))
+
+    return render_template(
+        "form.html",
+        form=form,
+        title="Import Products",
+        button_text="Import",
+        button_class="btn-success",
+        cancel_url=url_for("products.list_products"),
+        action_url=url_for("products.import_products"),
+        enctype="multipart/form-data",
+    )
+
+
+@products_bp.route("/<int:product_id>/stock", methods=["POST"])
+@admin_required
+def adjust_stock(product_id):
+    form = StockAdjustForm()
+    if not form.validate_on_submit():
+        flash("Enter a whole number to change the stock by.", "error")
+        return redirect(url_for("products.view_product", product_id=product_id))
+
+    stock = None
+    if product_id <= MAX_INT:
+        stock = queries.adjust_stock(product_id, form.delta.data)
+    if stock is None:
+        flash("Product not found or not enough stock.", "error")
+    else:
+        flash(f"Stock updated to {stock}.", "success")
+    return redirect(url_for("products.view_product", product_id=product_id))
+
+
+@products_bp.route("/stock", methods=["POST"])
+@admin_required
+def reserve_stock():
+    payload = request.get_json(silent=True) or {}
+    deltas: dict[int, int] = {}
+    try:
+        for item in payload["items"]:
+            product_id, delta = item["product_id"], item["delta"]
+            if type(product_id) is not int or type(delta) is not int:
+                raise TypeError
+            deltas[product_id] = deltas.get(product_id, 0) + delta
+            if not 0 < product_id <= MAX_INT or abs(deltas[product_id]) > MAX_INT:
+                raise TypeError
+    except (KeyError, TypeError):
+        return jsonify(
+            error='Expected {"items": [{"product_id": int, "delta": int}, ...]}.'
+        ), 400
+
+    if not deltas:
+        return jsonify(stock={})
+    stock, failed = queries.reserve_stock(deltas)
+    if failed:
+        return jsonify(
+            error="Products not found or not enough stock.", failed=failed
+        ), 409
+    return jsonify(
+        stock={str(product_id): value for product_id, value in stock.items()}
     )
+
+
+@products_bp.route("/bulk-edit", methods=["GET", "POST"])
+@admin_required
+def bulk_edit():
+    results, status = {}, 200
+    if request.method == "POST":
+        if request.is_json:
+            items = bulk.parse_json(request.get_json(silent=True))
+            if items is None:
+                return jsonify(
+                    error='Expected {"items": [{"id": int, "price": number, '
+                    '"stock": int}, ...]}.'
+                ), 400
+        else:
+            items = bulk.parse_form(request.form)
+
+        rows, status = bulk.apply(items, current_app.config["BULK_EDIT_MAX_ROWS"])
+        if request.is_json:
+            return jsonify(results=rows), status
+        if status == 200:
+            flash(f"Updated {len(rows)} products.", "success")
+            return redirect(request.url)
+        flash("No changes were saved. Fix the highlighted rows.", "error")
+        results = {row.get("id"): row for row in rows}
+
+    page = queries.get_products_page(**get_listing_args())
+    return render_template(
+        "bulk_edit.html",
+        products=page.items,
+        page=page,
+        results=results,
+        categories=queries.get_all_categories(),
+    ), status
+
+
+@products_bp.route("/export.<any(csv, jsonl):fmt>")
+def export_products(fmt):
+    rows = queries.iter_products(get_category_arg())
+    fields = [column.key for column in queries.PRODUCT_EXPORT_COLUMNS]
+
+    if fmt == "csv":
+        body, mimetype = export_csv(rows, fields), "text/csv"
+    else:
+        body, mimetype = export_jsonl(rows, fields), "application/x-ndjson"
+
+    response = current_app.response_class(stream_with_context(body), mimetype=mimetype)
+    response.headers["Content-Disposition"] = f"attachment; filename=products.{fmt}"
+    return response
+
+
+@products_bp.cli.command("import")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.option("--format", "fmt", type=click.Choice(["csv", "jsonl"]))
+@click.option("--upsert", is_flag=True, help="Update products with the same name.")
+@click.option("--batch-size", default=1000, show_default=True)
+def import_products_command(path, fmt, upsert, batch_size):
+    """Bulk import products from a CSV or JSONL file."""
+    fmt = fmt or path.suffix.lstrip(".").lower()
+    if fmt not in ("csv", "jsonl"):
+        raise click.BadParameter("cannot infer format, use --format", param_hint="path")
+    with path.open(
+        encoding="utf-8-sig", errors="surrogateescape", newline=""
+    ) as stream:
+        result = run_import(stream, fmt, upsert=upsert, batch_size=batch_size)
+
+    for line_num, message in result.errors:
+        click.echo(f"{path}:{line_num}: {message}", err=True)
+    click.echo(f"{result.imported} products imported, {len(result.errors)} rejected.")
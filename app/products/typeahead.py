@@ -0,0 +1,156 @@
+import bisect
+import logging
+import os
+import threading
+import time
+
+from flask import Flask
+from sqlalchemy import select
+
+from ..db import changes, queries
+from ..db.connection import db_session
+from ..db.models import Product
+
+logger = logging.getLogger(__name__)
+
+# Past this many pending changes a full rebuild is cheaper than patching.
+REBUILD_AFTER = 50_000
+CHANGE_BATCH = 5_000
+
+
+class PrefixIndex:
+    """Product names in case-folded sorted order, answered with bisect.
+
+    Only the refresh thread touches the database or builds new arrays.
+    Lookups read an immutable snapshot that the refresher swaps in whole, so
+    they never wait on a lock.
+    """
+
+    def __init__(self) -> None:
+        self._entries: tuple[list[str], list[int], dict[int, str]] = ([], [], {})
+        self.ready = False
+
+    def load(self, rows) -> None:
+        entries = sorted((name.casefold(), id_, name) for id_, name in rows)
+        self._entries = (
+            [key for key, _, _ in entries],
+            [id_ for _, id_, _ in entries],
+            {id_: name for _, id_, name in entries},
+        )
+        self.ready = True
+
+    def apply(self, upserted: dict[int, str], deleted: set[int]) -> None:
+        keys, ids, names = self._entries
+        changed = {
+            id_: name for id_, name in upserted.items() if names.get(id_) != name
+        }
+        gone = {id_ for id_ in deleted if id_ in names}
+        if not changed and not gone:
+            return
+
+        # Patch copies so lookups keep reading the current snapshot meanwhile.
+        keys, ids, names = list(keys), list(ids), dict(names)
+        for id_ in gone | changed.keys():
+            if id_ in names:
+                i = bisect.bisect_left(keys, names.pop(id_).casefold())
+                while ids[i] != id_:
+                    i += 1
+                del keys[i], ids[i]
+        for id_, name in changed.items():
+            key = name.casefold()
+            i = bisect.bisect_left(keys, key)
+            while i < len(keys) and keys[i] == key and ids[i] < id_:
+                i += 1
+            keys.insert(i, key)
+            ids.insert(i, id_)
+            names[id_] = name
+        self._entries = (keys, ids, names)
+
+    def suggest(self, prefix: str, limit: int = 10) -> list[tuple[int, str]]:
+        keys, ids, names = self._entries
+        key = prefix.casefold()
+        i = bisect.bisect_left(keys, key)
+        end = min(i + limit, len(keys))
+        matches = []
+        while i < end and keys[i].startswith(key):
+            matches.append((ids[i], names[ids[i]]))
+            i += 1
+        return matches
+
+
+class Typeahead:
+    """Keeps a PrefixIndex current by following the change feed off-request."""
+
+    def __init__(self, app: Flask, interval: float) -> None:
+        self.app = app
+        self.interval = interval
+        self.index = PrefixIndex()
+        self._lock = threading.Lock()
+        self._cursor = (0, 0)
+        self._synced_at = float("-inf")
+        self._refreshing = False
+        self._pid = os.getpid()
+
+    def suggest(self, prefix: str, limit: int = 10) -> list[tuple[int, str]]:
+        self.maybe_refresh()
+        return self.index.suggest(prefix, limit)
+
+    def maybe_refresh(self) -> None:
+        with self._lock:
+            if self._pid != os.getpid():
+                # A forked worker inherits the index but not the refresh thread.
+                self._pid, self._refreshing = os.getpid(), False
+            if self._refreshing or time.monotonic() - self._synced_at < self.interval:
+                return
+            self._refreshing = True
+        threading.Thread(target=self._refresh, daemon=True).start()
+
+    def _refresh(self) -> None:
+        try:
+            with self.app.app_context():
+                if self.index.ready:
+                    self._follow_changes()
+                else:
+                    self._rebuild()
+        except Exception:
+            logger.exception("Refreshing the product typeahead failed")
+        finally:
+            db_session.remove()
+            with self._lock:
+                self._synced_at = time.monotonic()
+                self._refreshing = False
+
+    def _rebuild(self) -> None:
+        start = time.perf_counter()
+        # Take the cursor first: replaying changes that overlap the load is harmless.
+        cursor = changes.get_head()
+        self.index.load(db_session.execute(select(Product.id, Product.name)))
+        self._cursor = cursor
+        logger.info(
+            "Built product typeahead in %.0f ms", (time.perf_counter() - start) * 1000
+        )
+
+    def _follow_changes(self) -> None:
+        # Change ids roughly count the changes logged since the cursor.
+        if changes.get_head()[1] - self._cursor[1] > REBUILD_AFTER:
+            self._rebuild()
+            return
+
+        while rows := changes.get_changes(self._cursor, CHANGE_BATCH):
+            touched = {row.entity_id for row in rows if row.entity == changes.PRODUCT}
+            if touched:
+                found = queries.get_products_by_ids(sorted(touched), ["id", "name"])
+                upserted = {row.id: row.name for row in found}
+                self.index.apply(upserted, touched - set(upserted))
+            self._cursor = (rows[-1].txid, rows[-1].id)
+
+
+def init_app(app: Flask) -> None:
+    typeahead = Typeahead(app, app.config["TYPEAHEAD_REFRESH_SECONDS"])
+    app.extensions["typeahead"] = typeahead
+
+    # Build on the first request so CLI commands never load the catalog.
+    @app.before_request
+    def start_typeahead():
+        if not typeahead.index.ready:
+            typeahead.maybe_refresh()
@@ -1,16 +1,71 @@
-from typing import Sequence
+from decimal import Decimal
+from typing import Callable, Sequence
 
 from flask import request
 
 from ..db import queries
-from ..db.models import Category, Product
+from ..db.models import MAX_INT, Product
+from ..db.rows import CategoryRow
+from ..main.utils import get_page_args
 from .forms import ProductForm
 
 
+def _decimal(value: str) -> Decimal:
+    number = Decimal(value)
+    if not number.is_finite():
+        raise ValueError(value)
+    return number
+
+
+def _int(value: str) -> int:
+    number = int(value)
+    if not -MAX_INT <= number <= MAX_INT:
+        raise ValueError(value)
+    return number
+
+
+def _arg(name: str, cast: Callable):
+    value = request.args.get(name, "").strip()
+    if not value:
+        return None
+    try:
+        return cast(value)
+    except (ArithmeticError, ValueError):
+        return None
+
+
+def get_category_arg() -> int | None:
+    return _arg("category_id", _int)
+
+
+def get_listing_args(with_category: bool = True) -> dict:
+    """Sort, filter and cursor arguments for the product listing queries.
+
+    Unknown sort keys and malformed filter values are ignored, like invalid
+    cursors, rather than failing the page.
+    """
+    sort = request.args.get("sort", "name")
+    if sort not in queries.PRODUCT_SORTS:
+        sort = "name"
+    column, _ = queries.PRODUCT_SORTS[sort]
+
+    args = {
+        "sort": sort,
+        "min_price": _arg("min_price", _decimal),
+        "max_price": _arg("max_price", _decimal),
+        "min_stock": _arg("min_stock", _int),
+        "max_stock": _arg("max_stock", _int),
+        **get_page_args(cursor_types=(column.type.python_type, int)),
+    }
+    if with_category:
+        args["category_id"] = get_category_arg()
+    return args
+
+
 def handle_product_form(
     form: ProductForm,
     product: Product | None = None,
-    categories: Sequence[Category] | None = None,
+    categories: Sequence[CategoryRow] | None = None,
 ) -> tuple[dict, str | None] | tuple[None, None]:
     if categories is None:
         categories = queries.get_all_categories()
@@ -0,0 +1,95 @@
+import logging
+import re
+import time
+from collections import Counter
+
+from flask import Flask, g, has_request_context, request
+from sqlalchemy import Engine, event
+
+logger = logging.getLogger(__name__)
+
+_IN_LIST = re.compile(r"\((?:\s*(?:\?|%\(\w+\)s)\s*,)+\s*(?:\?|%\(\w+\)s)\s*\)")
+
+
+def statement_shape(statement: str) -> str:
+    return _IN_LIST.sub("(?)", " ".join(statement.split()))
+
+
+def _before_cursor_execute(
+    conn,  # noqa: ARG001
+    cursor,  # noqa: ARG001
+    statement,  # noqa: ARG001
+    parameters,  # noqa: ARG001
+    context,
+    executemany,  # noqa: ARG001
+):
+    # Kept on the execution context, which is dropped with the statement even
+    # when it fails and after_cursor_execute never runs.
+    context.profiling_start = time.perf_counter()
+
+
+def _after_cursor_execute(
+    conn,  # noqa: ARG001
+    cursor,  # noqa: ARG001
+    statement,
+    parameters,  # noqa: ARG001
+    context,
+    executemany,  # noqa: ARG001
+):
+    elapsed = time.perf_counter() - context.profiling_start
+    if not has_request_context() or "sql_queries" not in g:
+        return
+
+    g.sql_queries += 1
+    g.sql_time += elapsed
+    g.sql_shapes[statement_shape(statement)] += 1
+    if elapsed * 1000 >= g.sql_slow_ms:
+        logger.warning(
+            "Slow query (%.1f ms) in %s: %s",
+            elapsed * 1000,
+            request.endpoint,
+            statement_shape(statement),
+        )
+
+
+def init_app(app: Flask, *engines: Engine) -> None:
+    if not app.config.get("SQL_PROFILING"):
+        return
+
+    for engine in engines:
+        if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+            event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+            event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+    slow_ms = app.config["SQL_SLOW_QUERY_MS"]
+    repeat_threshold = app.config["SQL_N_PLUS_ONE_THRESHOLD"]
+
+    @app.before_request
+    def start_profiling():
+        g.request_start = time.perf_counter()
+        g.sql_queries = 0
+        g.sql_time = 0.0
+        g.sql_shapes = Counter()
+        g.sql_slow_ms = slow_ms
+
+    @app.after_request
+    def report_profiling(response):
+        if "sql_queries" not in g:
+            return response
+
+        total_ms = (time.perf_counter() - g.request_start) * 1000
+        response.headers.add(
+            "Server-Timing",
+            f'db;dur={g.sql_time * 1000:.1f};desc="{g.sql_queries} queries"',
+        )
+        response.headers.add("Server-Timing", f"app;dur={total_ms:.1f}")
+
+        for shape, count in g.sql_shapes.items():
+            if count >= repeat_threshold:
+                logger.warning(
+                    "Possible N+1 in %s: %d executions of %s",
+                    request.endpoint,
+                    count,
+                    shape,
+                )
+        return response
@@ -0,0 +1,40 @@
+import logging
+import os
+import time
+
+import click
+from flask import Flask
+from jinja2 import FileSystemBytecodeCache
+
+logger = logging.getLogger(__name__)
+
+
+def warm_up(app: Flask) -> int:
+    """Compile every template so its bytecode lands in the shared cache."""
+    names = app.jinja_env.list_templates(extensions=("html",))
+    for name in names:
+        app.jinja_env.get_template(name)
+    return len(names)
+
+
+def init_app(app: Flask) -> None:
+    cache_dir = app.config.get("JINJA_CACHE_DIR") or os.path.join(
+        app.instance_path, "jinja_cache"
+    )
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+    except OSError:
+        logger.warning("Jinja bytecode cache disabled, cannot create %s", cache_dir)
+    else:
+        app.jinja_env.bytecode_cache = FileSystemBytecodeCache(cache_dir)
+
+    @app.cli.command("warm-up")
+    def warm_up_command():
+        """Precompile templates into the bytecode cache."""
+        start = time.perf_counter()
+        count = warm_up(app)
+        elapsed = (time.perf_counter() - start) * 1000
+        click.echo(f"Compiled {count} templates in {elapsed:.1f} ms.")
+
+    if app.config.get("TEMPLATE_WARMUP"):
+        warm_up(app)
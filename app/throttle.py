@@ -0,0 +1,160 @@
+import sqlite3
+import threading
+import time
+from collections import Counter, OrderedDict
+from contextlib import closing
+from dataclasses import dataclass
+
+from flask import Flask
+
+COUNTERS = ("accepted", "rejected_client", "rejected_global")
+
+
+@dataclass(frozen=True, slots=True)
+class Limit:
+    burst: int
+    per_second: float
+
+    def refill(self, tokens: float, elapsed: float) -> float:
+        return min(self.burst, tokens + max(0.0, elapsed) * self.per_second)
+
+    def wait(self, tokens: float) -> float:
+        return (1 - tokens) / self.per_second if self.per_second else float("inf")
+
+
+def _counter(key: str) -> str:
+    return f"rejected_{key.partition(':')[0]}"
+
+
+class MemoryBackend:
+    """Token buckets for a single process, bounded to ``max_keys`` clients."""
+
+    def __init__(self, max_keys: int = 10_000) -> None:
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._counters: Counter[str] = Counter()
+
+    def take(self, limits: dict[str, Limit]) -> float | None:
+        now = time.monotonic()
+        with self._lock:
+            tokens = {}
+            for key, limit in limits.items():
+                level, updated = self._buckets.get(key, (limit.burst, now))
+                tokens[key] = limit.refill(level, now - updated)
+                if tokens[key] < 1:
+                    self._counters[_counter(key)] += 1
+                    return limit.wait(tokens[key])
+
+            for key, level in tokens.items():
+                self._buckets[key] = (level - 1, now)
+                self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            self._counters["accepted"] += 1
+            return None
+
+    def counters(self) -> dict[str, int]:
+        with self._lock:
+            return {name: self._counters[name] for name in COUNTERS}
+
+
+class SQLiteBackend:
+    """Token buckets shared by every worker process through one SQLite file."""
+
+    PRUNE_AFTER = 3600
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS buckets "
+                "(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS counters "
+                "(name TEXT PRIMARY KEY, value INTEGER NOT NULL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=5, isolation_level=None)
+
+    def _count(self, conn: sqlite3.Connection, name: str) -> None:
+        conn.execute(
+            "INSERT INTO counters (name, value) VALUES (?, 1) "
+            "ON CONFLICT (name) DO UPDATE SET value = value + 1",
+            (name,),
+        )
+
+    def take(self, limits: dict[str, Limit]) -> float | None:
+        now = time.time()
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            tokens = {}
+            for key, limit in limits.items():
+                row = conn.execute(
+                    "SELECT tokens, updated FROM buckets WHERE key = ?", (key,)
+                ).fetchone()
+                level, updated = row or (limit.burst, now)
+                tokens[key] = limit.refill(level, now - updated)
+                if tokens[key] < 1:
+                    self._count(conn, _counter(key))
+                    conn.execute("COMMIT")
+                    return limit.wait(tokens[key])
+
+            conn.executemany(
+                "INSERT OR REPLACE INTO buckets VALUES (?, ?, ?)",
+                [(key, level - 1, now) for key, level in tokens.items()],
+            )
+            conn.execute(
+                "DELETE FROM buckets WHERE updated < ?", (now - self.PRUNE_AFTER,)
+            )
+            self._count(conn, "accepted")
+            conn.execute("COMMIT")
+            return None
+
+    def counters(self) -> dict[str, int]:
+        with closing(self._connect()) as conn:
+            values = dict(conn.execute("SELECT name, value FROM counters"))
+        return {name: values.get(name, 0) for name in COUNTERS}
+
+
+class LoginThrottle:
+    def __init__(
+        self,
+        backend: MemoryBackend | SQLiteBackend,
+        client_limit: Limit,
+        global_limit: Limit,
+    ) -> None:
+        self.backend = backend
+        self.client_limit = client_limit
+        self.global_limit = global_limit
+
+    def check(self, client: str) -> float | None:
+        """Spend a token from the client and global buckets.
+
+        Returns None when the attempt may proceed, otherwise the number of
+        seconds until the exhausted bucket has a token again.
+        """
+        return self.backend.take(
+            {f"client:{client}": self.client_limit, "global": self.global_limit}
+        )
+
+    def counters(self) -> dict[str, int]:
+        return self.backend.counters()
+
+
+def init_app(app: Flask) -> None:
+    path = app.config.get("LOGIN_THROTTLE_DB")
+    backend = SQLiteBackend(path) if path else MemoryBackend()
+    app.extensions["login_throttle"] = LoginThrottle(
+        backend,
+        Limit(
+            app.config["LOGIN_CLIENT_BURST"],
+            app.config["LOGIN_CLIENT_PER_MINUTE"] / 60,
+        ),
+        Limit(
+            app.config["LOGIN_GLOBAL_BURST"],
+            app.config["LOGIN_GLOBAL_PER_MINUTE"] / 60,
+        ),
+    )
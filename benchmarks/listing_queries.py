@@ -0,0 +1,100 @@
+"""Compare the ORM listing path with the column-projected listing query.
+
+Usage: python -m benchmarks.listing_queries [--rows N] [--repeat N]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+from decimal import Decimal
+
+
+def seed(engine, rows: int) -> None:
+    from sqlalchemy import insert
+
+    from app.db.models import Base, Category, Product
+
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Category), [{"name": "Bench", "description": "Bench"}])
+        batch = []
+        for i in range(rows):
+            batch.append(
+                {
+                    "name": f"Product {i:08d}",
+                    "description": "Lorem ipsum dolor sit amet. " * 20,
+                    "price": Decimal("9.99"),
+                    "stock": i % 100,
+                    "category_id": 1,
+                }
+            )
+            if len(batch) == 10_000:
+                conn.execute(insert(Product), batch)
+                batch.clear()
+        if batch:
+            conn.execute(insert(Product), batch)
+
+
+def measure(fn, repeat: int) -> tuple[float, int, int]:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = fn()
+        best = min(best, time.perf_counter() - start)
+        del rows
+
+    tracemalloc.start()
+    rows = fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak, len(rows)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    tmpdir = tempfile.TemporaryDirectory()
+    os.environ["DB_URL"] = f"sqlite:///{tmpdir.name}/bench.db"
+
+    from sqlalchemy import select
+
+    from app.db.connection import db_session, init_engine
+    from app.db.models import Product
+    from app.db.queries import PRODUCT_SUMMARY_COLUMNS
+    from app.db.rows import ProductSummary
+
+    engine = init_engine()
+    seed(engine, args.rows)
+
+    def orm_path():
+        rows = db_session.scalars(select(Product).order_by(Product.name)).all()
+        db_session.remove()
+        return rows
+
+    def projected_path():
+        stmt = select(*PRODUCT_SUMMARY_COLUMNS).order_by(Product.name)
+        rows = [ProductSummary(*row) for row in db_session.execute(stmt)]
+        db_session.remove()
+        return rows
+
+    print(
+        f"{'path':<10} {'time (ms)':>10} {'us/row':>8} {'peak (MiB)':>11} {'B/row':>8}"
+    )
+    for label, fn in (("orm", orm_path), ("projected", projected_path)):
+        best, peak, count = measure(fn, args.repeat)
+        print(
+            f"{label:<10} {best * 1000:>10.1f} {best * 1e6 / count:>8.2f} "
+            f"{peak / 2**20:>11.1f} {peak / count:>8.0f}"
+        )
+
+    engine.dispose()
+    tmpdir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,368 @@
+"""Benchmark every blueprint route against seeded SQLite catalogs.
+
+Usage: python -m benchmarks.routes [--sizes 1000,100000,1000000] [--requests N]
+       [--output results.json] [--compare previous.json]
+
+Databases are cached in --db-dir and reused across runs. Each catalog size
+runs in its own process so engines, caches and memory are not shared.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+import time
+import tracemalloc
+from datetime import UTC, datetime
+from pathlib import Path
+
+CATEGORIES = 21
+SEED = 42
+
+
+def seed(db_path: Path, products: int) -> None:
+    from sqlalchemy import create_engine
+
+    from app.db.init_db import reset_schema, seed_catalog
+
+    engine = create_engine(f"sqlite:///{db_path}")
+    reset_schema(engine)
+    seed_catalog(engine, products, categories=CATEGORIES, seed=SEED)
+    engine.dispose()
+
+
+def middle_cursor(db_path: Path, size: int) -> str:
+    from app.db.pagination import encode_cursor
+
+    with sqlite3.connect(db_path) as conn:
+        row = conn.execute(
+            "SELECT name, id FROM products ORDER BY name, id LIMIT 1 OFFSET ?",
+            (size // 2,),
+        ).fetchone()
+    return encode_cursor(row)
+
+
+def build_routes(size: int, deep_cursor: str) -> list[tuple[str, str, callable]]:
+    from app.db.pagination import encode_cursor
+
+    first_added_category = CATEGORIES + 1
+
+    def product_form(i, prefix):
+        return {
+            "name": f"{prefix} {i:08d}",
+            "description": "Benchmark product",
+            "price": "19.99",
+            "stock": "5",
+            "category_id": "2",
+        }
+
+    def reservation(i):
+        items = [{"product_id": 1 + (i + k) % size, "delta": 1} for k in range(10)]
+        return {"items": items}
+
+    def bulk_edit(i):
+        items = [
+            {"id": 1 + (i * 10 + k) % size, "price": "24.99", "stock": 10 + k}
+            for k in range(10)
+        ]
+        return {"items": items}
+
+    def suggest(i):
+        prefix = ("so", "sam", "lap", "micro")[i % 4]
+        return f"/products/suggest?prefix={prefix}"
+
+    def id_batch(i):
+        return ",".join(str(1 + (i * 50 + k) % size) for k in range(50))
+
+    return [
+        ("GET /", "GET", lambda _i: ("/", None)),
+        ("GET /login", "GET", lambda _i: ("/login", None)),
+        ("GET /login/stats", "GET", lambda _i: ("/login/stats", None)),
+        ("GET /categories/", "GET", lambda _i: ("/categories/", None)),
+        ("GET /categories/<id>", "GET", lambda i: (f"/categories/{2 + i % 10}", None)),
+        (
+            "GET /categories/<id> (deep page)",
+            "GET",
+            lambda _i: (f"/categories/2?after={deep_cursor}", None),
+        ),
+        ("GET /categories/add", "GET", lambda _i: ("/categories/add", None)),
+        ("GET /categories/<id>/edit", "GET", lambda _i: ("/categories/2/edit", None)),
+        ("GET /products/", "GET", lambda _i: ("/products/", None)),
+        (
+            "GET /products/ (deep page)",
+            "GET",
+            lambda _i: (f"/products/?after={deep_cursor}", None),
+        ),
+        (
+            "GET /products/ (filtered)",
+            "GET",
+            lambda _i: ("/products/?sort=-price&min_stock=1&max_price=500", None),
+        ),
+        ("GET /products/<id>", "GET", lambda i: (f"/products/{1 + i % size}", None)),
+        ("GET /products/add", "GET", lambda _i: ("/products/add", None)),
+        ("GET /products/<id>/edit", "GET", lambda i: (f"/products/{1 + i}/edit", None)),
+        (
+            "GET /products/search",
+            "GET",
+            lambda _i: ("/products/search?q=sony+pro", None),
+        ),
+        ("GET /products/suggest", "GET", lambda i: (suggest(i), None)),
+        (
+            "GET /products/export.csv",
+            "GET",
+            lambda i: (f"/products/export.csv?category_id={2 + i % 10}", None),
+        ),
+        ("GET /products/import", "GET", lambda _i: ("/products/import", None)),
+        ("GET /products/bulk-edit", "GET", lambda _i: ("/products/bulk-edit", None)),
+        ("GET /api/products", "GET", lambda _i: ("/api/products", None)),
+        (
+            "GET /api/products (sparse, sorted)",
+            "GET",
+            lambda _i: ("/api/products?fields=id,name,price&sort=-price", None),
+        ),
+        (
+            "GET /api/products?ids=",
+            "GET",
+            lambda i: (f"/api/products?ids={id_batch(i)}", None),
+        ),
+        (
+            "GET /api/products/<id>",
+            "GET",
+            lambda i: (f"/api/products/{1 + i % size}", None),
+        ),
+        ("GET /api/categories", "GET", lambda _i: ("/api/categories", None)),
+        (
+            "GET /api/categories/<id>",
+            "GET",
+            lambda i: (f"/api/categories/{2 + i % 10}", None),
+        ),
+        (
+            "POST /products/add",
+            "POST",
+            lambda i: ("/products/add", product_form(i, "Bench")),
+        ),
+        (
+            "POST /products/<id>/edit",
+            "POST",
+            lambda i: (f"/products/{1 + i}/edit", product_form(i, "Edited")),
+        ),
+        (
+            "POST /products/<id>/stock",
+            "POST",
+            lambda i: (f"/products/{1 + i % size}/stock", {"delta": "1"}),
+        ),
+        (
+            "POST /products/stock",
+            "JSON",
+            lambda i: ("/products/stock", reservation(i)),
+        ),
+        (
+            "POST /products/bulk-edit",
+            "JSON",
+            lambda i: ("/products/bulk-edit", bulk_edit(i)),
+        ),
+        (
+            "POST /products/<id>/delete",
+            "POST",
+            lambda i: (f"/products/{size - i}/delete", {}),
+        ),
+        (
+            "POST /categories/add",
+            "POST",
+            lambda i: ("/categories/add", {"name": f"Bench {i}", "description": "b"}),
+        ),
+        (
+            "POST /categories/<id>/edit",
+            "POST",
+            lambda i: (
+                f"/categories/{2 + i % (CATEGORIES - 1)}/edit",
+                {"name": f"Edited {i}", "description": "b"},
+            ),
+        ),
+        (
+            "POST /categories/<id>/delete",
+            "POST",
+            lambda i: (f"/categories/{first_added_category + i}/delete", {}),
+        ),
+        (
+            "GET /api/changes",
+            "GET",
+            lambda i: (f"/api/changes?after={encode_cursor([0, i * 10])}", None),
+        ),
+        ("GET /api/changes/head", "GET", lambda _i: ("/api/changes/head", None)),
+        ("GET /logout", "GET", lambda _i: ("/logout", None)),
+    ]
+
+
+def run_size(size: int, requests: int, db_dir: Path) -> None:
+    db_path = db_dir / f"bench-{size}.db"
+    working = db_dir / f"bench-{size}.work.db"
+    os.environ["DB_URL"] = f"sqlite:///{working}"
+    os.environ.setdefault("SECRET_KEY", "benchmark")
+    os.environ.setdefault("ADMIN_PASSWORD_HASH", "benchmark")
+
+    if not db_path.exists():
+        start = time.perf_counter()
+        seed(db_path, size)
+        print(f"Seeded {size} products in {time.perf_counter() - start:.1f}s")
+
+    # Mutating routes change the data, so every run works on a fresh copy.
+    working.unlink(missing_ok=True)
+    with sqlite3.connect(db_path) as source, sqlite3.connect(working) as target:
+        source.backup(target)
+
+    from sqlalchemy import event
+
+    from app import create_app
+    from app.db.connection import get_engine
+
+    app = create_app()
+    app.config["WTF_CSRF_ENABLED"] = False
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session["is_admin"] = True
+
+    # The typeahead index builds in the background after the first request.
+    # Let it finish so the build does not overlap the timed routes.
+    client.get("/")
+    deadline = time.monotonic() + 120
+    while not app.extensions["typeahead"].index.ready and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+    query_count = 0
+
+    def count_queries(*args):  # noqa: ARG001
+        nonlocal query_count
+        query_count += 1
+
+    event.listen(get_engine(), "before_cursor_execute", count_queries)
+
+    def request(method, url, data):
+        if method == "GET":
+            response = client.get(url)
+        elif method == "JSON":
+            response = client.post(url, json=data)
+        else:
+            response = client.post(url, data=data)
+        response.get_data()
+        return response.status_code
+
+    results = []
+    deep_cursor = middle_cursor(working, size)
+    for name, method, make_request in build_routes(size, deep_cursor):
+        timings, statuses = [], set()
+        query_count = 0
+        for i in range(requests):
+            url, data = make_request(i)
+            start = time.perf_counter()
+            statuses.add(request(method, url, data))
+            timings.append((time.perf_counter() - start) * 1000)
+        queries = query_count / requests
+
+        url, data = make_request(requests)
+        tracemalloc.start()
+        request(method, url, data)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        cuts = statistics.quantiles(timings, n=100, method="inclusive")
+        results.append(
+            {
+                "size": size,
+                "route": name,
+                "requests": requests,
+                "p50_ms": round(cuts[49], 3),
+                "p95_ms": round(cuts[94], 3),
+                "p99_ms": round(cuts[98], 3),
+                "queries_per_request": round(queries, 2),
+                "peak_kib": round(peak / 1024, 1),
+                "statuses": sorted(statuses),
+            }
+        )
+    (db_dir / f"bench-{size}.json").write_text(json.dumps(results))
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_table(results: list[dict], baseline: dict | None) -> None:
+    header = (
+        f"{'size':>8}  {'route':<34} {'p50':>8} {'p95':>8} {'p99':>8} "
+        f"{'q/req':>6} {'peak KiB':>9}"
+    )
+    print(header)
+    print("-" * len(header))
+    for row in results:
+        line = (
+            f"{row['size']:>8}  {row['route']:<34} {row['p50_ms']:>8.2f} "
+            f"{row['p95_ms']:>8.2f} {row['p99_ms']:>8.2f} "
+            f"{row['queries_per_request']:>6.1f} {row['peak_kib']:>9.1f}"
+        )
+        previous = baseline and baseline.get((row["size"], row["route"]))
+        if previous:
+            change = (row["p95_ms"] - previous["p95_ms"]) / previous["p95_ms"] * 100
+            line += f"  p95 {change:+.0f}%"
+        print(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1000,100000,1000000")
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--db-dir", type=Path, default=Path(".benchmarks"))
+    parser.add_argument("--output", type=Path, default=Path("bench_results.json"))
+    parser.add_argument("--compare", type=Path, help="previous results to diff against")
+    args = parser.parse_args()
+
+    args.db_dir.mkdir(parents=True, exist_ok=True)
+    sizes = [int(size) for size in args.sizes.split(",")]
+    context = multiprocessing.get_context("spawn")
+
+    results = []
+    for size in sizes:
+        process = context.Process(
+            target=run_size, args=(size, args.requests, args.db_dir)
+        )
+        process.start()
+        process.join()
+        if process.exitcode != 0:
+            raise SystemExit(f"Benchmark for {size} products failed.")
+        partial = args.db_dir / f"bench-{size}.json"
+        results.extend(json.loads(partial.read_text()))
+        partial.unlink()
+
+    report = {
+        "meta": {
+            "created_at": datetime.now(UTC).isoformat(),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "requests_per_route": args.requests,
+        },
+        "results": results,
+    }
+    args.output.write_text(json.dumps(report, indent=2))
+
+    baseline = None
+    if args.compare:
+        previous = json.loads(args.compare.read_text())["results"]
+        baseline = {(row["size"], row["route"]): row for row in previous}
+    print_table(results, baseline)
+    print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
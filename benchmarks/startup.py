@@ -0,0 +1,115 @@
+"""Measure worker cold-start cost: imports, create_app and first requests.
+
+Usage: python -m benchmarks.startup [--runs N] [--output startup.json]
+
+Every run is a fresh interpreter. Scenarios cover an empty Jinja bytecode
+cache, a cache filled by a previous worker, and TEMPLATE_WARMUP at startup.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PAGES = ("/", "/products/", "/categories/", "/products/1", "/login")
+
+
+def probe() -> None:
+    start = time.perf_counter()
+    from app import create_app
+
+    imported = time.perf_counter()
+    app = create_app()
+    created = time.perf_counter()
+
+    client = app.test_client()
+    first = {}
+    for page in PAGES:
+        request_start = time.perf_counter()
+        client.get(page).get_data()
+        first[page] = (time.perf_counter() - request_start) * 1000
+
+    print(
+        json.dumps(
+            {
+                "import_ms": (imported - start) * 1000,
+                "create_app_ms": (created - imported) * 1000,
+                "first_requests_ms": sum(first.values()),
+                "total_ms": (time.perf_counter() - start) * 1000,
+            }
+        )
+    )
+
+
+def seed(db_path: Path) -> None:
+    from sqlalchemy import create_engine
+
+    from app.db.init_db import reset_schema, seed_catalog
+
+    engine = create_engine(f"sqlite:///{db_path}")
+    reset_schema(engine)
+    seed_catalog(engine, 1000, categories=6)
+    engine.dispose()
+
+
+def run(env: dict) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.startup", "--probe"],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--output", type=Path, help="write results as JSON")
+    parser.add_argument("--probe", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.probe:
+        probe()
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "startup.db"
+        cache_dir = Path(tmp) / "jinja"
+        seed(db_path)
+        env = {
+            **os.environ,
+            "DB_URL": f"sqlite:///{db_path}",
+            "SECRET_KEY": os.getenv("SECRET_KEY", "benchmark"),
+            "ADMIN_PASSWORD_HASH": os.getenv("ADMIN_PASSWORD_HASH", "benchmark"),
+            "JINJA_CACHE_DIR": str(cache_dir),
+        }
+
+        scenarios = {"cold cache": [], "warm cache": [], "warm-up": []}
+        for _ in range(args.runs):
+            for path in cache_dir.glob("*"):
+                path.unlink()
+            scenarios["cold cache"].append(run(env))
+            scenarios["warm cache"].append(run(env))
+            scenarios["warm-up"].append(run({**env, "TEMPLATE_WARMUP": "1"}))
+
+    metrics = ("import_ms", "create_app_ms", "first_requests_ms", "total_ms")
+    results = {
+        name: {key: statistics.median(run[key] for run in runs) for key in metrics}
+        for name, runs in scenarios.items()
+    }
+
+    print(f"{'scenario':<12} " + " ".join(f"{key:>18}" for key in metrics))
+    for name, row in results.items():
+        print(f"{name:<12} " + " ".join(f"{row[key]:>18.1f}" for key in metrics))
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
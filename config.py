@@ -1,8 +1,32 @@
 import os
 
 
+def _env_flag(name: str) -> bool:
+    return os.getenv(name, "").lower() in ("1", "true", "yes", "on")
+
+
 class Config:
     SECRET_KEY = os.getenv("SECRET_KEY")
     ADMIN_PASSWORD_HASH = os.getenv("ADMIN_PASSWORD_HASH")
     DEFAULT_CATEGORY_ID = 1
     DEFAULT_CATEGORY_NAME = "Uncategorized"
+    PAGE_SIZE = 24
+    MAX_PAGE_SIZE = 100
+    SEARCH_MAX_CANDIDATES = int(os.getenv("SEARCH_MAX_CANDIDATES", "200"))
+    SQL_PROFILING = _env_flag("SQL_PROFILING")
+    SQL_SLOW_QUERY_MS = int(os.getenv("SQL_SLOW_QUERY_MS", "100"))
+    SQL_N_PLUS_ONE_THRESHOLD = int(os.getenv("SQL_N_PLUS_ONE_THRESHOLD", "5"))
+    FRAGMENT_CACHE_BYTES = int(os.getenv("FRAGMENT_CACHE_BYTES", str(32 * 2**20)))
+    FRAGMENT_CACHE_DIR = os.getenv("FRAGMENT_CACHE_DIR") or None
+    FRAGMENT_CACHE_MAX_FILES = int(os.getenv("FRAGMENT_CACHE_MAX_FILES", "10000"))
+    API_MAX_IDS = int(os.getenv("API_MAX_IDS", "500"))
+    LOGIN_CLIENT_BURST = int(os.getenv("LOGIN_CLIENT_BURST", "5"))
+    LOGIN_CLIENT_PER_MINUTE = int(os.getenv("LOGIN_CLIENT_PER_MINUTE", "6"))
+    LOGIN_GLOBAL_BURST = int(os.getenv("LOGIN_GLOBAL_BURST", "20"))
+    LOGIN_GLOBAL_PER_MINUTE = int(os.getenv("LOGIN_GLOBAL_PER_MINUTE", "120"))
+    LOGIN_THROTTLE_DB = os.getenv("LOGIN_THROTTLE_DB") or None
+    COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", "1024"))
+    JINJA_CACHE_DIR = os.getenv("JINJA_CACHE_DIR") or None
+    TEMPLATE_WARMUP = _env_flag("TEMPLATE_WARMUP")
+    BULK_EDIT_MAX_ROWS = int(os.getenv("BULK_EDIT_MAX_ROWS", "500"))
+    TYPEAHEAD_REFRESH_SECONDS = float(os.getenv("TYPEAHEAD_REFRESH_SECONDS", "2"))